@@ -7,13 +7,21 @@ import argparse
 import shutil
 import os
 import textwrap
-import requests
-import zipfile
-import io
-
-# Import colorama and termcolor for colored logs
+import shlex
+import tempfile
+import collections
+import abc
+import signal
+import threading
+import json
+import random
+import contextlib
+import re
+import importlib.util
+
+# Import colorama for colored logs. Heavier modules (requests, asyncio,
+# zipfile) are imported by the functions that need them to keep startup fast.
 from colorama import init, Fore, Style
-from termcolor import colored
 
 # Initialize colorama
 init(autoreset=True)
@@ -42,139 +50,674 @@ def print_ascii_art():
 
     print('\n')
 
-def run_command(command, cwd=None, verbose=True, check=True):
+class OutputCapture:
+    """Bounded capture of a command's combined output.
+
+    The most recent output is kept in an in-memory ring of at most
+    ``ring_bytes`` bytes of UTF-8. Lines that fall out of the ring are spilled to
+    temporary files, which are rotated once they reach ``spill_file_bytes``;
+    only the newest ``max_spill_files`` are kept. The transcript can be
+    searched with ``contains`` (or ``in``) without loading it into memory,
+    and ``str()`` gives the tail that is still in memory. Spill files stay
+    open until ``close`` (or leaving a ``with`` block), at the latest when the
+    capture is garbage collected.
+    """
+
+    def __init__(self, ring_bytes=256 * 1024, spill_file_bytes=8 * 1024 * 1024, max_spill_files=4):
+        self.ring_bytes = ring_bytes
+        self.spill_file_bytes = spill_file_bytes
+        self.max_spill_files = max_spill_files
+        self._ring = collections.deque()
+        self._ring_size = 0
+        self._spill_files = []
+        self._spill_size = 0
+        self.total_lines = 0
+        self.total_bytes = 0
+        self.dropped_lines = 0
+
+    @staticmethod
+    def _size(line):
+        return len(line.encode('utf-8', errors='replace'))
+
+    def append(self, line):
+        size = self._size(line)
+        self._ring.append(line)
+        self._ring_size += size
+        self.total_lines += 1
+        self.total_bytes += size
+        while self._ring_size > self.ring_bytes and len(self._ring) > 1:
+            evicted = self._ring.popleft()
+            evicted_size = self._size(evicted)
+            self._ring_size -= evicted_size
+            self._spill(evicted, evicted_size)
+
+    def _spill(self, line, size):
+        if not self._spill_files or self._spill_size >= self.spill_file_bytes:
+            self._rotate()
+        self._spill_files[-1][0].write(line)
+        self._spill_files[-1][1] += 1
+        self._spill_size += size
+
+    def _rotate(self):
+        if len(self._spill_files) >= self.max_spill_files:
+            oldest, lines = self._spill_files.pop(0)
+            oldest.close()
+            self.dropped_lines += lines
+        self._spill_files.append([tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace'), 0])
+        self._spill_size = 0
+
+    def lines(self):
+        """Yield every retained line, oldest first."""
+        for spill_file, _ in list(self._spill_files):
+            spill_file.flush()
+            spill_file.seek(0)
+            try:
+                for line in spill_file:
+                    yield line
+            finally:
+                # Also when the caller stops early: the next spill appends at the end.
+                spill_file.seek(0, os.SEEK_END)
+        for line in list(self._ring):
+            yield line
+
+    def contains(self, *needles, ignore_case=False):
+        """Return True if any of ``needles`` occurs on a line of the transcript."""
+        if ignore_case:
+            needles = [needle.lower() for needle in needles]
+        # Most markers we look for are near the end, so check the ring first.
+        for line in reversed(self._ring):
+            if ignore_case:
+                line = line.lower()
+            if any(needle in line for needle in needles):
+                return True
+        for spill_file, _ in self._spill_files:
+            spill_file.flush()
+            spill_file.seek(0)
+            try:
+                for line in spill_file:
+                    if ignore_case:
+                        line = line.lower()
+                    if any(needle in line for needle in needles):
+                        return True
+            finally:
+                spill_file.seek(0, os.SEEK_END)
+        return False
+
+    def __contains__(self, needle):
+        return self.contains(needle)
+
+    def __bool__(self):
+        return self.total_lines > 0
+
+    def __str__(self):
+        return ''.join(self._ring)
+
+    def close(self):
+        for spill_file, _ in self._spill_files:
+            spill_file.close()
+        self._spill_files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        self.close()
+
+# Characters that only mean something to a shell. String commands containing
+# any of them keep going through the shell; plain ones are split and run directly.
+SHELL_METACHARACTERS = frozenset('|&;<>()$`\\"\'*?[]#~%{}!\n')
+
+def prepare_command(command):
+    """Return ``(args, shell)`` for launching ``command``.
+
+    argv lists are run directly, with the executable resolved on PATH. Strings
+    are the compatibility path for older callers: on POSIX, strings without
+    shell syntax are split with shlex and run directly as well; anything else
+    still goes through the shell.
+    """
+    if isinstance(command, (list, tuple)):
+        args = [str(arg) for arg in command]
+        executable = shutil.which(args[0])
+        if executable:
+            args[0] = executable
+        return args, False
+    if os.name == 'posix' and not SHELL_METACHARACTERS.intersection(command):
+        args = shlex.split(command)
+        if args and '=' not in args[0]:
+            return prepare_command(args)
+    return command, True
+
+def format_command(command):
+    """Render a command for log messages."""
+    if isinstance(command, str):
+        return command
+    if os.name == 'nt':
+        return subprocess.list2cmdline(command)
+    return ' '.join(shlex.quote(str(arg)) for arg in command)
+
+def run_command(command, cwd=None, verbose=True, check=True, output=print):
+    display = format_command(command)
     if verbose:
-        print(Fore.LIGHTBLUE_EX + f"➤ Running command: {command}")
+        output(Fore.LIGHTBLUE_EX + f"➤ Running command: {display}")
+    args, shell = prepare_command(command)
     try:
         process = subprocess.Popen(
-            command,
+            args,
             cwd=cwd,
-            shell=True,
+            shell=shell,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True
         )
-        stdout = ''
-        while True:
-            line = process.stdout.readline()
-            if not line:
-                break
-            stdout += line
-            if verbose:
-                print(Fore.WHITE + line.strip())
-        returncode = process.wait()
-        if returncode != 0 and check:
-            print(Fore.RED + f"✘ Command '{command}' failed with return code {returncode}.")
-            sys.exit(1)
-        return returncode, stdout, ''
-    except subprocess.CalledProcessError as e:
+    except OSError as e:
+        # The executable could not be started; report it like a shell would.
         if check:
-            print(Fore.RED + f"✘ Error executing: {command}")
+            output(Fore.RED + f"✘ Error executing: {display} ({e})")
             sys.exit(1)
+        captured = OutputCapture()
+        captured.append(f"{e}\n")
+        return 127, captured, ''
+    captured = OutputCapture()
+    for line in process.stdout:
+        captured.append(line)
+        if verbose:
+            output(Fore.WHITE + line.strip())
+    returncode = process.wait()
+    if returncode != 0 and check:
+        captured.close()
+        output(Fore.RED + f"✘ Command '{display}' failed with return code {returncode}.")
+        sys.exit(1)
+    return returncode, captured, ''
+
+class CommandError(Exception):
+    """Raised by async_run_command when a checked command exits non-zero."""
+
+    def __init__(self, command, returncode, output):
+        super().__init__(f"Command '{command}' failed with return code {returncode}.")
+        self.command = command
+        self.returncode = returncode
+        self.output = output
+
+# Bytes read from a child's output at a time; longer lines are passed on in pieces of about this size.
+ASYNC_READ_CHUNK = 64 * 1024
+
+async def async_run_command(command, cwd=None, verbose=True, check=True, prefix=None, output=print):
+    """Asyncio counterpart of run_command.
+
+    Output lines are streamed through ``output`` as they arrive, prefixed with
+    ``[prefix]`` so interleaved output of concurrent commands stays readable.
+    Instead of exiting, a failing checked command raises CommandError. If the
+    awaiting task is cancelled the child process is terminated.
+    """
+    import asyncio
+    import codecs
+
+    label = f"[{prefix}] " if prefix else ""
+    display = format_command(command)
+    if verbose:
+        output(Fore.LIGHTBLUE_EX + f"➤ {label}Running command: {display}")
+    args, shell = prepare_command(command)
+    # A process group of its own lets cancellation stop a shell's children too.
+    options = dict(
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        start_new_session=os.name == 'posix'
+    )
+    try:
+        if shell:
+            process = await asyncio.create_subprocess_shell(args, **options)
         else:
-            return e.returncode, e.output, ''
+            process = await asyncio.create_subprocess_exec(*args, **options)
+    except OSError as e:
+        if check:
+            raise CommandError(display, 127, None) from e
+        captured = OutputCapture()
+        captured.append(f"{e}\n")
+        if verbose:
+            output(Fore.WHITE + label + str(e))
+        return 127, captured, ''
+    captured = OutputCapture()
+
+    def emit(line):
+        captured.append(line)
+        if verbose:
+            output(Fore.WHITE + label + line.strip())
+
+    # StreamReader.readline() gives up on lines longer than its 64 KiB buffer,
+    # so read chunks and split them here; overlong lines are passed on in pieces.
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    try:
+        while True:
+            chunk = await process.stdout.read(ASYNC_READ_CHUNK)
+            pending += decoder.decode(chunk, final=not chunk)
+            lines = pending.split('\n')
+            pending = lines.pop()
+            for line in lines:
+                emit(line + '\n')
+            if len(pending) >= ASYNC_READ_CHUNK:
+                emit(pending)
+                pending = ''
+            if not chunk:
+                break
+        if pending:
+            emit(pending)
+        returncode = await process.wait()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            try:
+                if os.name == 'posix':
+                    os.killpg(process.pid, signal.SIGTERM)
+                else:
+                    process.terminate()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+        captured.close()
+        raise
+    if returncode != 0 and check:
+        raise CommandError(display, returncode, captured)
+    return returncode, captured, ''
+
+class CommandGroup:
+    """Run independent commands concurrently.
+
+    Commands are started with ``start`` inside ``async with``; leaving the
+    block waits for all of them. As soon as one task fails the remaining ones
+    are cancelled (terminating their processes) and the error is re-raised.
+    Results are available by name in ``results`` afterwards.
+    """
+
+    def __init__(self, verbose=True, output=print):
+        self.verbose = verbose
+        self.output = output
+        self.results = {}
+        self._tasks = {}
+
+    async def __aenter__(self):
+        return self
+
+    def start(self, name, command, cwd=None, check=True):
+        import asyncio
+
+        task = asyncio.ensure_future(async_run_command(
+            command, cwd=cwd, verbose=self.verbose, check=check, prefix=name, output=self.output
+        ))
+        self._tasks[name] = task
+        return task
+
+    async def __aexit__(self, exc_type, exc, tb):
+        import asyncio
 
-def install_python_packages(verbose=False):
-    required_packages = ['PyGithub', 'requests', 'colorama', 'termcolor']
-    for package in required_packages:
+        pending = set(self._tasks.values())
+        if exc_type is not None:
+            await self._cancel(pending)
+            return False
         try:
-            __import__(package)
-        except ImportError:
-            print(Fore.YELLOW + f"⚠️  Installing missing Python package: {package}")
-            run_command(f"{sys.executable} -m pip install {package}", verbose=verbose)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    if task.exception() is not None:
+                        await self._cancel(pending)
+                        raise task.exception()
+        except asyncio.CancelledError:
+            await self._cancel(pending)
+            raise
+        self.results = {name: task.result() for name, task in self._tasks.items()}
+        return False
+
+    @staticmethod
+    async def _cancel(tasks):
+        import asyncio
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def run_commands_concurrently(commands, cwd=None, verbose=True, check=True, output=print):
+    """Run a ``{name: command}`` mapping concurrently and return ``{name: result}``.
+
+    Each result has the same shape as run_command's return value.
+    """
+    import asyncio
+
+    async def run_all():
+        async with CommandGroup(verbose=verbose, output=output) as group:
+            for name, command in commands.items():
+                group.start(name, command, cwd=cwd, check=check)
+        return group.results
 
-def install_with_chocolatey(package, verbose=False):
     try:
-        subprocess.run(
-            "choco -v",
-            shell=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-    except subprocess.CalledProcessError:
-        print(Fore.RED + "✘ Chocolatey is not installed. Please install Chocolatey to install the required packages.")
-        print("Visit https://chocolatey.org/install for installation instructions.")
+        return asyncio.run(run_all())
+    except CommandError as e:
+        output(Fore.RED + f"✘ {e}")
         sys.exit(1)
 
-    print(Fore.YELLOW + f"⚠️  Installing {package} with Chocolatey...")
-    run_command(f"choco install {package} -y", verbose=verbose)
+PROBE_CACHE_TTL = 24 * 60 * 60
 
-def install_with_apt(package, verbose=False):
-    try:
-        run_command("sudo apt-get update", verbose=verbose)
-        run_command(f"sudo apt-get install -y {package}", verbose=verbose)
-    except:
-        print(Fore.RED + f"✘ Error installing {package} with apt. Please install {package} manually.")
-        sys.exit(1)
+def get_cache_dir():
+    """Return the per-user cache directory for this tool."""
+    if os.name == 'nt':
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser(os.path.join('~', 'AppData', 'Local'))
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser(os.path.join('~', 'Library', 'Caches'))
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base, 'pear-compiler')
 
-def install_with_homebrew(package, verbose=False):
+def file_fingerprint(path):
+    """Identify a file by path, mtime and inode so replacing it invalidates cache entries."""
     try:
-        subprocess.run(
-            "brew --version",
-            shell=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-    except subprocess.CalledProcessError:
-        print(Fore.RED + "✘ Homebrew is not installed. Please install Homebrew to install the required packages.")
-        print("Visit https://brew.sh/ for installation instructions.")
-        sys.exit(1)
+        st = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{path}:{st.st_mtime_ns}:{st.st_ino}"
+
+def tool_probe_key(name, *extra_paths):
+    """Cache key for probing ``name``, or None if the binary cannot be found."""
+    path = shutil.which(name)
+    if not path:
+        return None
+    path = os.path.realpath(path)
+    parts = [name, file_fingerprint(path), sys.version]
+    parts.extend(file_fingerprint(extra) for extra in extra_paths)
+    return '|'.join(parts)
+
+def gh_hosts_file():
+    """Location of gh's hosts.yml, which changes whenever gh logs in or out."""
+    config_dir = os.getenv('GH_CONFIG_DIR')
+    if not config_dir:
+        if os.name == 'nt':
+            config_dir = os.path.join(os.getenv('APPDATA', ''), 'GitHub CLI')
+        else:
+            config_home = os.getenv('XDG_CONFIG_HOME') or os.path.expanduser(os.path.join('~', '.config'))
+            config_dir = os.path.join(config_home, 'gh')
+    return os.path.join(config_dir, 'hosts.yml')
 
-    print(Fore.YELLOW + f"⚠️  Installing {package} with Homebrew...")
-    run_command(f"brew install {package}", verbose=verbose)
+class ProbeCache:
+    """Successful dependency probe results persisted between runs.
 
-def check_and_install_git(verbose=False):
+    Entries are keyed on everything the result depends on (see tool_probe_key)
+    and expire after ``ttl`` seconds. With ``refresh`` set, lookups always miss
+    so every probe runs again and the fresh results are written back. Without
+    ``persist`` the file is neither read nor written.
+    """
+
+    def __init__(self, path=None, ttl=PROBE_CACHE_TTL, refresh=False, persist=True):
+        self.path = path or os.path.join(get_cache_dir(), 'probes.json')
+        self.ttl = ttl
+        self.refresh = refresh
+        self.persist = persist
+        self.entries = {}
+        self.dirty = False
+        if persist and not refresh:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, key):
+        if self.refresh or key is None:
+            return None
+        entry = self.entries.get(key)
+        if not entry or time.time() - entry['time'] > self.ttl:
+            return None
+        return entry['value']
+
+    def put(self, key, value):
+        if key is None:
+            return
+        self.entries[key] = {'time': time.time(), 'value': value}
+        self.dirty = True
+
+    def discard(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty or not self.persist:
+            return
+        now = time.time()
+        entries = {key: entry for key, entry in self.entries.items() if now - entry['time'] <= self.ttl}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            # The cache is only an optimisation; never fail the run over it.
+            pass
+
+# Used when requirements.txt is not shipped next to the script (e.g. frozen builds).
+DEFAULT_REQUIREMENTS = ['PyGithub', 'requests', 'colorama', 'PyQt5']
+
+# Distributions whose importable top-level module has a different name.
+IMPORT_NAMES = {
+    'PyGithub': 'github',
+}
+
+# Only needed by compiler_gui.py, so the CLI does not install them.
+GUI_ONLY_PACKAGES = {'PyQt5', 'PyGithub'}
+
+def read_requirements(path=None):
+    """Return the requirement specifiers listed in requirements.txt, without duplicates."""
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'requirements.txt')
     try:
-        run_command("git --version", verbose=verbose)
-        print(Fore.GREEN + "✔ Git is installed.")
-    except:
-        print(Fore.YELLOW + "⚠️  Git is not installed.")
-        install_git(verbose=verbose)
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        lines = DEFAULT_REQUIREMENTS
+    requirements = []
+    seen = set()
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line or line.startswith('-'):
+            continue
+        name = requirement_name(line)
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            requirements.append(line)
+    return requirements
+
+def requirement_name(requirement):
+    """Distribution name of a requirement specifier such as ``requests>=2.0``."""
+    return re.split(r'[\s\[<>=!~;@]', requirement, maxsplit=1)[0]
+
+def is_package_installed(distribution):
+    """Check for a distribution without importing it."""
+    import_name = IMPORT_NAMES.get(distribution, distribution)
+    try:
+        if importlib.util.find_spec(import_name) is not None:
+            return True
+    except (ImportError, ValueError):
+        pass
+    try:
+        from importlib import metadata
+    except ImportError:
+        return False
+    try:
+        metadata.distribution(distribution)
+        return True
+    except metadata.PackageNotFoundError:
+        return False
+
+def install_python_packages(verbose=False, cache=None, include_gui=False):
+    requirements = [
+        requirement for requirement in read_requirements()
+        if include_gui or requirement_name(requirement) not in GUI_ONLY_PACKAGES
+    ]
+    cache_key = '|'.join(['python-packages', file_fingerprint(os.path.realpath(sys.executable)), sys.version] + requirements)
+    if cache and cache.get(cache_key):
+        return
+    missing = [requirement for requirement in requirements if not is_package_installed(requirement_name(requirement))]
+    if missing:
+        print(Fore.YELLOW + f"⚠️  Installing missing Python packages: {', '.join(missing)}")
+        run_command([sys.executable, "-m", "pip", "install"] + missing, verbose=verbose)
+        importlib.invalidate_caches()
+    if cache:
+        cache.put(cache_key, True)
+
+class PackageManager(abc.ABC):
+    """Installs system packages with the platform's package manager.
+
+    One instance is shared for the whole session (see get_package_manager):
+    availability is checked once, the package index is refreshed at most once
+    and skipped while it is still fresh, and all packages requested together
+    are installed in a single transaction. Messages and command output go
+    through ``output``, like run_command's.
+    """
+
+    name = None
+    install_url = None
+    version_command = None
+    update_command = None
+    # Indexes younger than this are considered fresh enough to install from.
+    index_max_age = 6 * 60 * 60
+
+    def __init__(self, verbose=False, output=print):
+        self.verbose = verbose
+        self.output = output
+        self._available = None
+        self._index_refreshed = False
+
+    def ensure_available(self):
+        if self._available is None:
+            returncode, output, _ = run_command(self.version_command, verbose=False, check=False)
+            output.close()
+            self._available = returncode == 0
+        if not self._available:
+            self.output(Fore.RED + f"✘ {self.name} is not installed. Please install {self.name} to install the required packages.")
+            self.output(f"Visit {self.install_url} for installation instructions.")
+            sys.exit(1)
+
+    def index_is_fresh(self):
+        return False
+
+    def refresh_index(self):
+        if self.update_command is None or self._index_refreshed:
+            return
+        if not self.index_is_fresh():
+            self.output(Fore.YELLOW + f"⚠️  Refreshing {self.name} package index...")
+            run_command(self.update_command, verbose=self.verbose, output=self.output)
+        self._index_refreshed = True
+
+    @abc.abstractmethod
+    def install_command(self, packages):
+        """Command line that installs ``packages`` in one transaction."""
+
+    def install(self, packages):
+        if not packages:
+            return
+        self.ensure_available()
+        self.refresh_index()
+        self.output(Fore.YELLOW + f"⚠️  Installing {', '.join(packages)} with {self.name}...")
+        returncode, output, _ = run_command(self.install_command(packages), verbose=self.verbose, check=False, output=self.output)
+        output.close()
+        if returncode != 0:
+            names = ', '.join(packages)
+            self.output(Fore.RED + f"✘ Error installing {names} with {self.name}. Please install {names} manually.")
+            sys.exit(1)
+
+class ChocolateyPackageManager(PackageManager):
+    name = "Chocolatey"
+    install_url = "https://chocolatey.org/install"
+    version_command = ["choco", "-v"]
 
-def install_git(verbose=False):
+    def install_command(self, packages):
+        return ["choco", "install"] + packages + ["-y"]
+
+class AptPackageManager(PackageManager):
+    name = "apt"
+    install_url = "https://wiki.debian.org/Apt"
+    version_command = ["apt-get", "--version"]
+    update_command = ["sudo", "apt-get", "update"]
+    lists_dir = "/var/lib/apt/lists"
+
+    def index_is_fresh(self):
+        try:
+            return time.time() - os.stat(self.lists_dir).st_mtime < self.index_max_age
+        except OSError:
+            return False
+
+    def install_command(self, packages):
+        return ["sudo", "apt-get", "install", "-y"] + packages
+
+class HomebrewPackageManager(PackageManager):
+    name = "Homebrew"
+    install_url = "https://brew.sh/"
+    version_command = ["brew", "--version"]
+    # brew install refreshes its own index when it is stale, once per invocation.
+
+    def install_command(self, packages):
+        return ["brew", "install"] + packages
+
+PACKAGE_MANAGERS = {
+    "Windows": ChocolateyPackageManager,
+    "Linux": AptPackageManager,
+    "Darwin": HomebrewPackageManager,
+}
+
+_package_managers = {}
+
+def get_package_manager(verbose=False, output=print):
+    """Return the session's package manager for this OS, or None if unsupported.
+
+    ``verbose`` and ``output`` take effect when the session's manager is created.
+    """
     current_os = platform.system()
-    if current_os == "Windows":
-        install_with_chocolatey("git", verbose=verbose)
-    elif current_os == "Linux":
-        install_with_apt("git", verbose=verbose)
-    elif current_os == "Darwin":
-        install_with_homebrew("git", verbose=verbose)
-    else:
-        print(Fore.RED + "✘ Automatic installation of Git is not supported on this operating system. Please install Git manually.")
+    if current_os not in _package_managers:
+        manager_class = PACKAGE_MANAGERS.get(current_os)
+        _package_managers[current_os] = manager_class(verbose=verbose, output=output) if manager_class else None
+    return _package_managers[current_os]
+
+SYSTEM_PACKAGE_NAMES = {
+    "git": "Git",
+    "gh": "GitHub CLI",
+}
+
+def install_system_packages(packages, verbose=False, output=print):
+    if not packages:
+        return
+    manager = get_package_manager(verbose=verbose, output=output)
+    if manager is None:
+        names = ' and '.join(SYSTEM_PACKAGE_NAMES.get(package, package) for package in packages)
+        output(Fore.RED + f"✘ Automatic installation of {names} is not supported on this operating system. Please install {names} manually.")
         sys.exit(1)
+    manager.install(packages)
 
-def check_and_install_gh(verbose=False):
-    try:
-        run_command("gh --version", verbose=verbose)
+def check_git(verbose=False, probe=None):
+    returncode, _, _ = probe or run_command(["git", "--version"], verbose=verbose, check=False)
+    if returncode == 0:
+        print(Fore.GREEN + "✔ Git is installed.")
+        return True
+    print(Fore.YELLOW + "⚠️  Git is not installed.")
+    return False
+
+def check_gh(verbose=False, probe=None):
+    returncode, _, _ = probe or run_command(["gh", "--version"], verbose=verbose, check=False)
+    if returncode == 0:
         print(Fore.GREEN + "✔ GitHub CLI (gh) is installed.")
-        # Check if gh is authenticated
-        _, auth_status, _ = run_command("gh auth status", verbose=verbose)
-        if "You are not logged into any GitHub hosts" in auth_status:
-            print(Fore.YELLOW + "⚠️  GitHub CLI is not authenticated. Please authenticate.")
-            run_command("gh auth login", verbose=verbose)
-            run_command("gh auth setup-git", verbose=verbose)
-    except:
-        print(Fore.YELLOW + "⚠️  GitHub CLI (gh) is not installed.")
-        install_gh(verbose=verbose)
-        print(Fore.YELLOW + "⚠️  Please authenticate GitHub CLI.")
-        run_command("gh auth login", verbose=verbose)
-        run_command("gh auth setup-git", verbose=verbose)
+        return True
+    print(Fore.YELLOW + "⚠️  GitHub CLI (gh) is not installed.")
+    return False
 
-def install_gh(verbose=False):
-    current_os = platform.system()
-    if current_os == "Windows":
-        install_with_chocolatey("gh", verbose=verbose)
-    elif current_os == "Linux":
-        install_with_apt("gh", verbose=verbose)
-    elif current_os == "Darwin":
-        install_with_homebrew("gh", verbose=verbose)
-    else:
-        print(Fore.RED + "✘ Automatic installation of GitHub CLI is not supported on this operating system. Please install GitHub CLI manually.")
-        sys.exit(1)
+def authenticate_gh(verbose=False):
+    run_command(["gh", "auth", "login"], verbose=verbose)
+    run_command(["gh", "auth", "setup-git"], verbose=verbose)
+
+def check_gh_auth(verbose=False, auth_probe=None):
+    _, auth_status, _ = auth_probe or run_command(["gh", "auth", "status"], verbose=verbose, check=False)
+    if "You are not logged into any GitHub hosts" in auth_status:
+        print(Fore.YELLOW + "⚠️  GitHub CLI is not authenticated. Please authenticate.")
+        authenticate_gh(verbose=verbose)
 
 def get_github_token(args):
     token = args.token or os.getenv('GITHUB_TOKEN')
@@ -185,62 +728,743 @@ def get_github_token(args):
         sys.exit(1)
     return token
 
-def create_repo(repo_name, github_token, verbose=False):
-    from github import Github, GithubException
+class RateLimitScheduler:
+    """Paces GitHub API calls so the token's rate limit is not exhausted.
 
-    g = Github(github_token)
-    user = g.get_user()
-    try:
-        repo = user.create_repo(repo_name, private=False, auto_init=False)
+    ``update`` reads the X-RateLimit-* headers of every response, and a
+    secondary rate limit's Retry-After. ``acquire`` is called before each
+    request and sleeps when needed: while a Retry-After is in effect, until
+    the reset once the budget is used up, and once fewer than ``reserve``
+    requests remain, long enough to spread them over the rest of the window.
+    """
+
+    def __init__(self, reserve=100, sleep=time.sleep):
+        self.reserve = reserve
+        self.sleep = sleep
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        now = time.time()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.remaining is None or self.reset_at is None or self.reset_at <= now:
+            return 0
+        if self.remaining <= 0:
+            return self.reset_at - now + 1
+        if self.remaining < self.reserve:
+            return (self.reset_at - now) / self.remaining
+        return 0
+
+    def acquire(self):
+        with self._lock:
+            delay = self.delay()
+            if self.remaining is not None:
+                # Account for this request before its response arrives.
+                self.remaining -= 1
+        if delay > 0:
+            self.sleep(delay)
+
+    def update(self, response):
+        """Record the budget reported by ``response``; return True if it was rate limited."""
+        headers = response.headers
+        with self._lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+                self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 0))
+                self.reset_at = int(headers.get("X-RateLimit-Reset", self.reset_at or 0))
+            if response.status_code not in (403, 429):
+                return False
+            retry_after = headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                self.blocked_until = time.time() + int(retry_after)
+                return True
+            if self.remaining == 0 and self.reset_at:
+                self.blocked_until = self.reset_at + 1
+                return True
+            return False
+
+    def budget(self):
+        """Current view of the rate limit, for callers that want to adapt."""
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+            "blocked_for": max(0, self.blocked_until - time.time()),
+        }
+
+    def poll_interval(self, base):
+        """Stretch a polling interval so that polling alone stays within the remaining budget."""
+        now = time.time()
+        if self.remaining is None or self.reset_at is None or self.reset_at <= now:
+            return base
+        spare = self.remaining - self.reserve
+        if spare <= 0:
+            return max(base, self.reset_at - now)
+        return max(base, (self.reset_at - now) / spare)
+
+class RetryPolicy:
+    """Retries transient network and server failures.
+
+    Delays grow exponentially from ``base_delay`` up to ``max_delay``, with
+    full jitter (a random delay between zero and that bound) so that several
+    clients do not retry in lockstep. A request is tried at most
+    ``max_attempts`` times, and each endpoint may spend at most
+    ``endpoint_budget`` retries per run, so one broken endpoint cannot stall
+    the pipeline. Requests that are not idempotent are only retried when they
+    provably never reached the server.
+    """
+
+    RETRY_STATUSES = {500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=30.0, endpoint_budget=20):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.endpoint_budget = endpoint_budget
+        self._spent = collections.Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint(method, url):
+        """Group URLs that only differ in IDs, e.g. DELETE /repos/o/r/actions/runs/{id}."""
+        from urllib.parse import urlsplit
+
+        return f"{method.upper()} {re.sub(r'/[0-9]+(?=/|$)', '/{id}', urlsplit(url).path)}"
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def allow(self, method, url, attempt):
+        """Spend one retry for this endpoint if the attempt limit and budget allow it."""
+        if attempt + 1 >= self.max_attempts:
+            return False
+        endpoint = self.endpoint(method, url)
+        with self._lock:
+            if self._spent[endpoint] >= self.endpoint_budget:
+                return False
+            self._spent[endpoint] += 1
+        return True
+
+class ConditionalCache:
+    """Validators and bodies of earlier GET responses, keyed by URL and query.
+
+    Used by GitHubContext.get_json to turn repeated polls into conditional
+    requests that GitHub can answer with 304 Not Modified.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, params=None):
+        return (url, tuple(sorted((params or {}).items())))
+
+    def validators(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[2] if entry else None
+
+    def store(self, key, response, data):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock:
+                self._entries[key] = (etag, last_modified, data)
+
+class CassetteError(Exception):
+    """A replayed request has no recorded counterpart."""
+
+class Cassette:
+    """HTTP exchanges of one run, stored as gzip-compressed JSON.
+
+    ``--record`` appends every exchange that goes through the session, and
+    ``--replay`` serves them back in order. Requests are matched on method and
+    URL, falling back to method and path when the query differs (timestamps,
+    signed URLs). When the recorded exchanges for a request run out, the last
+    one is repeated, so a poll that is retried more often than during the
+    recording keeps seeing the final state. Credentials are never stored.
+    Response bodies larger than BODY_LIMIT, such as the IPA, are stored as
+    their size and SHA-256 only, and replayed as that many zero bytes.
+    """
+
+    version = 1
+    REDACTED_HEADERS = {'authorization', 'cookie', 'set-cookie'}
+    REDACTED_PARAMS = {'sig', 'token', 'x-amz-signature', 'x-amz-credential', 'x-amz-security-token'}
+    # Fields of JSON request bodies, at any depth; the webhook secret is sent as config.secret.
+    REDACTED_FIELDS = {'secret', 'token', 'password'}
+    # The body is stored decoded, so these would no longer describe it.
+    DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+    BODY_LIMIT = 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.interactions = []
+        # Random values the run generated, such as dispatch IDs, that replays must reuse.
+        self.values = {}
+        self._queues = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        import gzip
+
+        cassette = cls(path)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != cls.version:
+            raise CassetteError(f"Unsupported cassette version {data.get('version')} in '{path}'.")
+        cassette.interactions = data['interactions']
+        cassette.values = data.get('values', {})
+        return cassette
+
+    def save(self):
+        import gzip
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'values': self.values, 'interactions': self.interactions},
+                      f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def redact_url(cls, url):
+        from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+        parts = urlsplit(url)
+        query = [
+            (name, 'REDACTED' if name.lower() in cls.REDACTED_PARAMS else value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        ]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    @classmethod
+    def redact_body(cls, body):
+        """``body`` with REDACTED_FIELDS blanked out if it is JSON, otherwise unchanged."""
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body
+
+        def redact(value):
+            if isinstance(value, dict):
+                return {key: 'REDACTED' if key.lower() in cls.REDACTED_FIELDS else redact(item)
+                        for key, item in value.items()}
+            if isinstance(value, list):
+                return [redact(item) for item in value]
+            return value
+        return json.dumps(redact(data))
+
+    @staticmethod
+    def encode_body(body):
+        if body is None:
+            return None
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        try:
+            return {'text': body.decode('utf-8')}
+        except UnicodeDecodeError:
+            import base64
+
+            return {'base64': base64.b64encode(body).decode('ascii')}
+
+    @staticmethod
+    def decode_body(body):
+        """The recorded body, or None if only its size was kept."""
+        if body is None:
+            return b''
+        if 'size' in body:
+            return None
+        if 'text' in body:
+            return body['text'].encode('utf-8')
+        import base64
+
+        return base64.b64decode(body['base64'])
+
+    def record(self, request, response, elapsed):
+        interaction = {
+            'method': request.method,
+            'url': self.redact_url(request.url),
+            'request_headers': {
+                name: 'REDACTED' if name.lower() in self.REDACTED_HEADERS else value
+                for name, value in request.headers.items()
+            },
+            'request_body': (self.encode_body(self.redact_body(request.body))
+                             if isinstance(request.body, (bytes, str)) else None),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in self.REDACTED_HEADERS | self.DROPPED_HEADERS
+            },
+            # Filled in by store_body once the body has been read.
+            'body': None,
+            'elapsed': round(elapsed, 4),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+        return interaction
+
+    def store_body(self, interaction, body, size, digest):
+        """Keep ``body``, or only ``size`` and ``digest`` if it was over BODY_LIMIT (``body`` is None)."""
+        interaction['body'] = self.encode_body(body) if body is not None else {'size': size, 'sha256': digest}
+
+    def value(self, name, factory, replay=False):
+        """Generate and remember ``name`` while recording; return the remembered one on replay."""
+        if replay:
+            if name not in self.values:
+                raise CassetteError(f"No recorded value for '{name}' in '{self.path}'.")
+            return self.values[name]
+        self.values[name] = factory()
+        return self.values[name]
+
+    def next_interaction(self, request):
+        from urllib.parse import urlsplit
+
+        url = self.redact_url(request.url)
+        path = urlsplit(url).path
+        with self._lock:
+            if self._queues is None:
+                self._queues = collections.defaultdict(collections.deque)
+                for interaction in self.interactions:
+                    self._queues[(interaction['method'], interaction['url'])].append(interaction)
+                    self._queues[(interaction['method'], urlsplit(interaction['url']).path)].append(interaction)
+            for key in ((request.method, url), (request.method, path)):
+                queue = self._queues.get(key)
+                if queue:
+                    interaction = queue[0]
+                    if len(queue) > 1:
+                        queue.popleft()
+                    return interaction
+        raise CassetteError(f"No recorded response for {request.method} {url} in '{self.path}'.")
+
+def cassette_adapter(cassette, replay=False, time_scale=1.0, **adapter_kwargs):
+    """Return an HTTPAdapter that records into, or replays from, ``cassette``.
+
+    Replayed responses take their recorded time multiplied by ``time_scale``.
+    """
+    import hashlib
+    import io
+    from requests.adapters import HTTPAdapter
+    from requests.models import Response
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+
+    class RecordingStream:
+        """Wraps a response's raw stream and hands the body to the cassette once it has been read.
+
+        The body keeps streaming to the caller; at most Cassette.BODY_LIMIT
+        bytes of it are held for the cassette.
+        """
+
+        def __init__(self, raw, interaction):
+            self._raw = raw
+            self._interaction = interaction
+            self._copy = bytearray()
+            self._size = 0
+            self._hash = hashlib.sha256()
+
+        def __getattr__(self, name):
+            return getattr(self._raw, name)
+
+        def _add(self, chunk):
+            self._size += len(chunk)
+            self._hash.update(chunk)
+            if self._copy is not None:
+                self._copy += chunk
+                if len(self._copy) > Cassette.BODY_LIMIT:
+                    self._copy = None
+
+        def _finish(self):
+            body = bytes(self._copy) if self._copy is not None else None
+            cassette.store_body(self._interaction, body, self._size, self._hash.hexdigest())
+
+        def read(self, amt=None, *args, **kwargs):
+            chunk = self._raw.read(amt, *args, **kwargs)
+            self._add(chunk)
+            if amt is None or not chunk:
+                self._finish()
+            return chunk
+
+        def stream(self, *args, **kwargs):
+            for chunk in self._raw.stream(*args, **kwargs):
+                self._add(chunk)
+                yield chunk
+            self._finish()
+
+    class SyntheticBody(io.RawIOBase):
+        """``size`` zero bytes, produced as they are read."""
+
+        def __init__(self, size):
+            self.remaining = size
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            count = min(len(buffer), self.remaining)
+            buffer[:count] = bytes(count)
+            self.remaining -= count
+            return count
+
+    class CassetteAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            if replay:
+                return self.replay(request)
+            start = time.perf_counter()
+            response = super().send(request, **kwargs)
+            interaction = cassette.record(request, response, time.perf_counter() - start)
+            response.raw = RecordingStream(response.raw, interaction)
+            return response
+
+        def replay(self, request):
+            interaction = cassette.next_interaction(request)
+            if time_scale > 0:
+                time.sleep(interaction['elapsed'] * time_scale)
+            body = cassette.decode_body(interaction['body'])
+            response = Response()
+            response.status_code = interaction['status']
+            response.reason = interaction['reason']
+            response.headers = CaseInsensitiveDict(interaction['headers'])
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.url = request.url
+            response.request = request
+            if body is None:
+                size = interaction['body']['size']
+                response.headers['Content-Length'] = str(size)
+                response.raw = io.BufferedReader(SyntheticBody(size))
+            else:
+                response.headers['Content-Length'] = str(len(body))
+                response.raw = io.BytesIO(body)
+                response._content = body
+                response._content_consumed = True
+            return response
+
+    return CassetteAdapter(**adapter_kwargs)
+
+class GraphQLError(Exception):
+    """A GraphQL query was rejected or answered with errors."""
+
+class GitHubContext:
+    """Shared state for talking to GitHub, created once in main().
+
+    Every API call goes through ``request`` (or ``get_json`` / ``paginate`` /
+    ``graphql``), which uses one keep-alive ``requests.Session`` with a
+    connection pool sized by ``pool_size`` and lets the RateLimitScheduler
+    pace it. GraphQL has its own rate limit and therefore its own scheduler.
+    The login of the authenticated user is looked up only once.
+    """
+
+    api_url = "https://api.github.com"
+    # Base URL of the git remotes the project is pushed to.
+    git_url = "https://github.com"
+    # Give up on a request that keeps hitting secondary rate limits.
+    max_rate_limited_attempts = 5
+    # (connect, read) timeouts, so a stalled connection becomes a retryable error.
+    timeout = (10, 60)
+    # Keep-alive connections per host; requests beyond this open throwaway connections.
+    pool_size = 10
+
+    def __init__(self, token, pool_size=None, api_url=None, git_url=None, cassette=None, replay=False, time_scale=1.0):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if api_url:
+            self.api_url = api_url.rstrip('/')
+        if git_url:
+            self.git_url = git_url.rstrip('/')
+        self.token = token
+        if pool_size:
+            self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        })
+        if cassette is not None:
+            adapter = cassette_adapter(cassette, replay=replay, time_scale=time_scale,
+                                       pool_connections=4, pool_maxsize=self.pool_size)
+        else:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        # Waits between requests are scaled like replayed responses.
+        self.time_scale = time_scale if replay else 1.0
+        self.cassette = cassette
+        self.replaying = cassette is not None and replay
+        # Caches from the user cache directory opened during this run (see workflow_id_cache).
+        self.caches = {}
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.scheduler = RateLimitScheduler(sleep=self.sleep)
+        self.graphql_scheduler = RateLimitScheduler(sleep=self.sleep)
+        # Cleared after the first failed GraphQL query; callers then use REST.
+        self.use_graphql = True
+        self.retry_policy = RetryPolicy()
+        self.cache = ConditionalCache()
+        # The stage is per thread, so a background cleanup keeps its own.
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Retries spent and requests sent per pipeline stage, and when each stage ran.
+        self.retries = collections.Counter()
+        self.stage_requests = collections.Counter()
+        self.stage_log = []
+        self._login = None
+        # Requests sent, and how many of them were answered with 304 from the cache.
+        # GitHub does not count 304s against the rate limit.
+        self.requests_made = 0
+        self.not_modified = 0
+
+    @property
+    def quota_used(self):
+        """Requests that counted against the rate limit so far."""
+        return self.requests_made - self.not_modified
+
+    @property
+    def login(self):
+        if self._login is None:
+            self._login = self.get_json(f"{self.api_url}/user")["login"]
+        return self._login
+
+    @property
+    def current_stage(self):
+        return getattr(self._local, "stage", "setup")
+
+    def bind_stage(self, name):
+        """Attribute this thread's requests to ``name``, e.g. in worker threads of a stage."""
+        self._local.stage = name
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Attribute the requests made inside the block to pipeline stage ``name``."""
+        previous = self.current_stage
+        self.bind_stage(name)
+        start = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stage_log.append({"name": name, "start": start, "end": time.time()})
+            self.bind_stage(previous)
+
+    def unique_id(self, name):
+        """Return a fresh random hex ID; a replay gets the one generated while recording."""
+        import uuid
+
+        if self.cassette is not None:
+            return self.cassette.value(name, lambda: uuid.uuid4().hex, replay=self.replaying)
+        return uuid.uuid4().hex
+
+    def sleep(self, seconds):
+        """Wait between requests; shortened or skipped while replaying a cassette."""
+        if seconds * self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def write_stats(self, path):
+        """Write per-stage timings and request counts as JSON, e.g. for dev/bench_pipeline.py."""
+        stages = [
+            dict(entry, requests=self.stage_requests[entry["name"]], retries=self.retries[entry["name"]])
+            for entry in self.stage_log
+        ]
+        stats = {
+            "stages": stages,
+            "requests_made": self.requests_made,
+            "not_modified": self.not_modified,
+            "quota_used": self.quota_used,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+
+    def retry(self, method, url, attempt, reason):
+        """Decide whether to retry after ``reason``; sleeps and returns True if so."""
+        if not self.retry_policy.allow(method, url, attempt):
+            return False
+        delay = self.retry_policy.backoff(attempt)
+        with self._lock:
+            self.retries[self.current_stage] += 1
+        print(Fore.YELLOW + f"⚠️  {method} {url} failed ({reason}). Retrying in {delay:.1f}s...")
+        self.sleep(delay)
+        return True
+
+    def request(self, method, url, idempotent=None, scheduler=None, **kwargs):
+        """Send a request once the scheduler allows it.
+
+        Rate-limited responses are retried after the scheduler's wait, and
+        transient failures according to the retry policy. ``idempotent``
+        defaults to what the HTTP method implies.
+        """
+        import requests
+
+        scheduler = scheduler or self.scheduler
+        if idempotent is None:
+            idempotent = method.upper() in RetryPolicy.IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        rate_limited = 0
+        while True:
+            scheduler.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # A connect timeout means the request was never sent, so even
+                # non-idempotent requests are safe to repeat.
+                retryable = idempotent or isinstance(e, requests.ConnectTimeout)
+                if retryable and self.retry(method, url, attempt, type(e).__name__):
+                    attempt += 1
+                    continue
+                raise
+            with self._lock:
+                self.requests_made += 1
+                self.stage_requests[self.current_stage] += 1
+            if scheduler.update(response):
+                rate_limited += 1
+                if rate_limited < self.max_rate_limited_attempts:
+                    wait = scheduler.delay()
+                    print(Fore.YELLOW + f"⚠️  GitHub rate limit reached. Waiting {wait:.0f}s before retrying...")
+                    response.close()
+                    continue
+                return response
+            if (idempotent and response.status_code in RetryPolicy.RETRY_STATUSES
+                    and self.retry(method, url, attempt, f"HTTP {response.status_code}")):
+                response.close()
+                attempt += 1
+                continue
+            return response
+
+    def download(self, url, path, chunk_size=8192):
+        """Stream ``url`` to ``path``, starting over if the transfer breaks off."""
+        import requests
+
+        attempt = 0
+        while True:
+            try:
+                with self.request("GET", url, stream=True) as response:
+                    response.raise_for_status()
+                    with open(path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+                return
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                if not self.retry("GET", url, attempt, type(e).__name__):
+                    raise
+                attempt += 1
+
+    def get_json(self, url, params=None):
+        """GET ``url`` and decode the JSON body, revalidating cached responses.
+
+        If an earlier response for the same URL and query carried an ETag or
+        Last-Modified header, the request is made conditional and a 304 returns
+        the cached body.
+        """
+        key = self.cache.key(url, params)
+        response = self.request("GET", url, params=params, headers=self.cache.validators(key))
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+            return self.cache.get(key)
+        response.raise_for_status()
+        data = response.json()
+        self.cache.store(key, response, data)
+        return data
+
+    def graphql(self, query, variables=None):
+        """Run a GraphQL query and return its ``data``; raise GraphQLError on any error."""
+        # Queries do not change anything, so they are as safe to retry as a GET.
+        response = self.request("POST", f"{self.api_url}/graphql", idempotent=True,
+                                scheduler=self.graphql_scheduler,
+                                json={"query": query, "variables": variables or {}})
+        if response.status_code != 200:
+            raise GraphQLError(f"{response.status_code} - {response.text}")
+        body = response.json()
+        if body.get("errors"):
+            raise GraphQLError("; ".join(error.get("message", str(error)) for error in body["errors"]))
+        return body["data"]
+
+    def paginate(self, url, key, params=None):
+        """Yield the items under ``key`` from every page of a list endpoint."""
+        params = dict(params or {}, per_page=100)
+        while url:
+            response = self.request("GET", url, params=params)
+            response.raise_for_status()
+            yield from response.json().get(key, [])
+            url = response.links.get("next", {}).get("url")
+            # The next link already carries the query string.
+            params = None
+
+    def repo_url(self, repo_name, path=''):
+        return f"{self.api_url}/repos/{self.login}/{repo_name}{path}"
+
+def create_repo(repo_name, ctx, verbose=False):
+    data = {
+        "name": repo_name,
+        "private": False,
+        "auto_init": False
+    }
+    response = ctx.request("POST", f"{ctx.api_url}/user/repos", json=data)
+    if response.status_code == 201:
         print(Fore.GREEN + f"✔ Repository '{repo_name}' successfully created.")
-        return repo
-    except GithubException as e:
-        print(Fore.RED + f"✘ Error creating the repository: {e.data['message']}")
-        sys.exit(1)
+        return response.json()
+    print(Fore.RED + f"✘ Error creating the repository: {response.json().get('message', response.text)}")
+    sys.exit(1)
 
-def upload_project(repo_name, github_token, project_path, verbose=False):
-    from github import Github
+def get_existing_repo(repo_name, ctx, verbose=False):
+    response = ctx.request("GET", ctx.repo_url(repo_name))
+    if response.status_code != 200:
+        print(Fore.RED + f"✘ Repository '{repo_name}' was not found. Please ensure the name is correct.")
+        sys.exit(1)
+    print(Fore.GREEN + f"✔ Repository '{repo_name}' found.")
+    return response.json()
 
+def upload_project(repo_name, ctx, project_path, verbose=False):
     # Initialize Git repository if not already done
     if not os.path.isdir(os.path.join(project_path, ".git")):
         print(Fore.YELLOW + "⚠️  Initializing Git repository...")
-        run_command("git init", cwd=project_path, verbose=verbose)
+        run_command(["git", "init"], cwd=project_path, verbose=verbose)
 
     # Set remote 'origin' to the correct URL
-    github_username = get_github_username(github_token)
-    remote_url = f"https://github.com/{github_username}/{repo_name}.git"
+    remote_url = f"{ctx.git_url}/{ctx.login}/{repo_name}.git"
     print(Fore.YELLOW + f"⚠️  Setting remote 'origin' to {remote_url}")
-    run_command("git remote remove origin", cwd=project_path, verbose=verbose, check=False)
-    run_command(f"git remote add origin {remote_url}", cwd=project_path, verbose=verbose)
+    run_command(["git", "remote", "remove", "origin"], cwd=project_path, verbose=verbose, check=False)
+    run_command(["git", "remote", "add", "origin", remote_url], cwd=project_path, verbose=verbose)
 
     # Add files and push
     print(Fore.YELLOW + "⚠️  Adding files to Git...")
-    run_command("git add .", cwd=project_path, verbose=verbose)
+    run_command(["git", "add", "."], cwd=project_path, verbose=verbose)
     commit_message = "Initial commit"
-    returncode, stdout, _ = run_command(f'git commit -m "{commit_message}"', cwd=project_path, verbose=verbose, check=False)
-    commit_output = stdout.lower() if stdout else ''
-    if returncode != 0:
-        if "nothing to commit" in commit_output or "working tree clean" in commit_output:
-            print(Fore.YELLOW + "⚠️  Nothing to commit. Skipping commit step.")
+    returncode, stdout, _ = run_command(["git", "commit", "-m", commit_message], cwd=project_path, verbose=verbose, check=False)
+    with stdout:
+        if returncode != 0:
+            if stdout.contains("nothing to commit", "working tree clean", ignore_case=True):
+                print(Fore.YELLOW + "⚠️  Nothing to commit. Skipping commit step.")
+            else:
+                print(Fore.RED + f"✘ Error during git commit:\n{stdout}")
+                sys.exit(1)
         else:
-            print(Fore.RED + f"✘ Error during git commit:\n{stdout}")
-            sys.exit(1)
-    else:
-        print(Fore.GREEN + "✔ Commit created.")
+            print(Fore.GREEN + "✔ Commit created.")
 
     print(Fore.YELLOW + "⚠️  Pushing files to GitHub...")
-    run_command("git branch -M main", cwd=project_path, verbose=verbose)
-    run_command("git push -u origin main -f", cwd=project_path, verbose=verbose)
+    run_command(["git", "branch", "-M", "main"], cwd=project_path, verbose=verbose)
+    run_command(["git", "push", "-u", "origin", "main", "-f"], cwd=project_path, verbose=verbose)
     print(Fore.GREEN + f"✔ Project successfully uploaded to repository '{repo_name}'.")
 
-def get_github_username(github_token):
-    from github import Github
-
-    g = Github(github_token)
-    user = g.get_user()
-    return user.login
-
-def add_github_actions_workflow(workflow_content, project_path, verbose=False):
+def add_github_actions_workflow(workflow_content, project_path, verbose=False, settle_time=20):
     workflow_dir = os.path.join(project_path, '.github', 'workflows')
 
     # Remove existing workflow files
@@ -254,41 +1478,37 @@ def add_github_actions_workflow(workflow_content, project_path, verbose=False):
     else:
         os.makedirs(workflow_dir, exist_ok=True)
 
-    workflow_path = os.path.join(workflow_dir, 'build_ios.yml')
+    workflow_path = os.path.join(workflow_dir, WORKFLOW_FILE)
     with open(workflow_path, 'w', encoding='utf-8') as f:
         f.write(workflow_content)
     print(Fore.GREEN + "✔ GitHub Actions workflow file successfully created locally.")
 
     # Add the workflow directory to git and push
-    run_command(f"git add {workflow_dir}", cwd=project_path, verbose=verbose)
+    run_command(["git", "add", workflow_dir], cwd=project_path, verbose=verbose)
     commit_message = "Update GitHub Actions workflow for iOS build"
-    returncode, stdout, _ = run_command(f'git commit -m "{commit_message}"', cwd=project_path, verbose=verbose, check=False)
-    commit_output = stdout.lower() if stdout else ''
-    if returncode != 0:
-        if "nothing to commit" in commit_output or "working tree clean" in commit_output:
-            print(Fore.YELLOW + "⚠️  Workflow file already committed or no changes. Skipping commit step.")
+    returncode, stdout, _ = run_command(["git", "commit", "-m", commit_message], cwd=project_path, verbose=verbose, check=False)
+    with stdout:
+        if returncode != 0:
+            if stdout.contains("nothing to commit", "working tree clean", ignore_case=True):
+                print(Fore.YELLOW + "⚠️  Workflow file already committed or no changes. Skipping commit step.")
+            else:
+                print(Fore.RED + f"✘ Error during git commit:\n{stdout}")
+                sys.exit(1)
         else:
-            print(Fore.RED + f"✘ Error during git commit:\n{stdout}")
-            sys.exit(1)
-    else:
-        print(Fore.GREEN + "✔ Workflow commit created.")
+            print(Fore.GREEN + "✔ Workflow commit created.")
 
     print(Fore.YELLOW + "⚠️  Pushing workflow to GitHub...")
-    run_command("git push", cwd=project_path, verbose=verbose)
+    run_command(["git", "push"], cwd=project_path, verbose=verbose)
     print(Fore.GREEN + "✔ GitHub Actions workflow file successfully pushed to repository.")
 
     # Wait for GitHub to recognize the new workflow
-    print(Fore.YELLOW + "⏳ Waiting for GitHub to recognize the workflow...")
-    time.sleep(20)  # Wait for 20 seconds
+    if settle_time > 0:
+        print(Fore.YELLOW + "⏳ Waiting for GitHub to recognize the workflow...")
+        time.sleep(settle_time)
 
-def set_workflow_permissions(repo_name, github_token, verbose=False):
+def set_workflow_permissions(repo_name, ctx, verbose=False):
     print(Fore.YELLOW + "⚠️  Setting GitHub Actions permissions to 'Read and write'...")
-    owner = get_github_username(github_token)
-    url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/permissions"
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
+    url = ctx.repo_url(repo_name, "/actions/permissions")
     data = {
         "enabled": True,
         "allowed_actions": "all",
@@ -296,128 +1516,875 @@ def set_workflow_permissions(repo_name, github_token, verbose=False):
             "contents": "write"
         }
     }
-    response = requests.put(url, headers=headers, json=data)
+    response = ctx.request("PUT", url, json=data)
     if response.status_code in [200, 204]:
         print(Fore.GREEN + "✔ GitHub Actions permissions successfully set to 'Read and write'.")
     else:
         print(Fore.RED + f"✘ Failed to set GitHub Actions permissions: {response.status_code} - {response.text}")
         sys.exit(1)
 
-def trigger_workflow_dispatch(repo_name, github_token, verbose=False):
+def trigger_workflow_dispatch(repo_name, ctx, verbose=False):
+    """Dispatch the build and return what is needed to find its run.
+
+    GitHub answers a dispatch with 204 and no run ID, so each dispatch passes
+    a unique ``dispatch_id`` input that the workflow puts into its run name.
+    """
     print(Fore.YELLOW + "⚠️  Triggering GitHub Actions workflow via API...")
-    owner = get_github_username(github_token)
-    url = f"https://api.github.com/repos/{owner}/{repo_name}/actions/workflows/build_ios.yml/dispatches"
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
+    url = ctx.repo_url(repo_name, f"/actions/workflows/{WORKFLOW_FILE}/dispatches")
+    dispatch_id = ctx.unique_id("dispatch_id")
     data = {
-        "ref": "main"
+        "ref": "main",
+        "inputs": {"dispatch_id": dispatch_id}
     }
-    response = requests.post(url, headers=headers, json=data)
+    response = ctx.request("POST", url, json=data)
     if response.status_code in [204]:
         print(Fore.GREEN + "✔ Workflow dispatch event triggered successfully.")
+        # Compare run creation times against GitHub's clock rather than ours.
+        dispatched_at = time.time()
+        if response.headers.get("Date"):
+            from email.utils import parsedate_to_datetime
+
+            dispatched_at = parsedate_to_datetime(response.headers["Date"]).timestamp()
+        return {"id": dispatch_id, "dispatched_at": dispatched_at}
     else:
         print(Fore.RED + f"✘ Failed to trigger workflow dispatch: {response.status_code} - {response.text}")
         sys.exit(1)
 
-def wait_for_workflow_completion(repo, github_token, build_timeout, poll_interval, verbose=False):
-    from github import Github
+# The workflow that builds the IPA, as written by add_github_actions_workflow.
+WORKFLOW_FILE = "build_ios.yml"
+# Workflow IDs only change when a repository is recreated, and then so does its ID.
+WORKFLOW_ID_CACHE_TTL = 30 * 24 * 60 * 60
 
-    g = Github(github_token)
-    user = g.get_user()
-    repository = g.get_repo(f"{user.login}/{repo.name}")
-    print(Fore.YELLOW + "⏳ Waiting for the GitHub Actions workflow to start...")
-    start_time = time.time()
+def workflow_id_cache_key(repository, ctx, workflow_file=WORKFLOW_FILE):
+    return f"{ctx.api_url}|{repository['id']}|{workflow_file}"
+
+def workflow_id_cache(ctx):
+    """The workflow ID cache, opened once per run.
+
+    While recording or replaying it is kept in memory only: a cassette must
+    contain the lookup whatever this machine has cached, and a replay must
+    not write into the real cache.
+    """
+    cache = ctx.caches.get('workflows')
+    if cache is None:
+        cache = ctx.caches['workflows'] = ProbeCache(os.path.join(get_cache_dir(), 'workflows.json'),
+                                                     ttl=WORKFLOW_ID_CACHE_TTL, persist=ctx.cassette is None)
+    return cache
+
+def resolve_workflow_id(repository, ctx, workflow_file=WORKFLOW_FILE):
+    """Return the numeric ID of ``workflow_file``, or None while GitHub does not know it yet.
+
+    IDs are cached per repository in the user cache directory, so the
+    lookup happens once per repository rather than on every poll.
+    """
+    cache = workflow_id_cache(ctx)
+    key = workflow_id_cache_key(repository, ctx, workflow_file)
+    workflow_id = cache.get(key)
+    if workflow_id is not None:
+        return workflow_id
+    response = ctx.request("GET", f"{ctx.api_url}/repos/{repository['full_name']}/actions/workflows/{workflow_file}")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    workflow_id = response.json()['id']
+    cache.put(key, workflow_id)
+    cache.save()
+    return workflow_id
+
+def forget_workflow_id(repository, ctx, workflow_file=WORKFLOW_FILE):
+    cache = workflow_id_cache(ctx)
+    cache.discard(workflow_id_cache_key(repository, ctx, workflow_file))
+    cache.save()
+
+# Slack for runs whose creation time is rounded down or stamped slightly before the Date header.
+DISPATCH_CLOCK_SKEW = 5
+
+def find_dispatched_run(repository, ctx, dispatch):
+    """Return the workflow run started by ``dispatch``, or None if it has not appeared yet.
+
+    Only workflow_dispatch runs created since the dispatch are listed, newest
+    first and one per page, so the first request usually finds the run. All
+    of them are only looked through when builds were dispatched concurrently.
+    """
+    import requests
+
+    workflow_id = resolve_workflow_id(repository, ctx)
+    if workflow_id is None:
+        return None
+    since = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(dispatch['dispatched_at'] - DISPATCH_CLOCK_SKEW))
+    url = f"{ctx.api_url}/repos/{repository['full_name']}/actions/workflows/{workflow_id}/runs"
+    params = {'event': 'workflow_dispatch', 'created': f">={since}"}
+    try:
+        page = ctx.get_json(url, params=dict(params, per_page=1))
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code != 404:
+            raise
+        # The cached workflow ID is stale; it is looked up again on the next poll.
+        forget_workflow_id(repository, ctx)
+        return None
+
+    def is_ours(run):
+        return dispatch['id'] in (run.get('display_title') or '')
+
+    runs = page.get('workflow_runs', [])
+    if runs and not is_ours(runs[0]) and page.get('total_count', 0) > 1:
+        runs = ctx.paginate(url, 'workflow_runs', params=params)
+    return next((run for run in runs if is_ours(run)), None)
+
+# App ID of GitHub Actions; its check suites are the workflow runs.
+GITHUB_ACTIONS_APP_ID = 15368
+
+# Everything one poll needs in a single request: the check suites GitHub
+# Actions created for the head of the default branch (the dispatched build
+# runs there) and the assets of the latest release.
+BUILD_STATUS_QUERY = """
+query($owner: String!, $name: String!, $appId: Int!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          checkSuites(last: 20, filterBy: {appId: $appId}) {
+            nodes {
+              status
+              conclusion
+              workflowRun { databaseId file { path } }
+            }
+          }
+        }
+      }
+    }
+    latestRelease {
+      releaseAssets(first: 20) { nodes { name downloadUrl } }
+    }
+  }
+}
+"""
+
+def fetch_build_status(repository, ctx, workflow_file=WORKFLOW_FILE, run_id=None):
+    """Return the latest run of ``workflow_file`` and the latest release assets via GraphQL.
+
+    With ``run_id`` the run with that ID is returned instead of the latest one.
+    The run is a dict with the REST field names (id, status, conclusion) or
+    None if it is not among the check suites of the branch head; the assets
+    are dicts with ``name`` and ``browser_download_url``. Returns None, and
+    switches ``ctx`` to REST for the rest of the session, when the query fails.
+    """
+    owner, name = repository['full_name'].split('/', 1)
+    try:
+        data = ctx.graphql(BUILD_STATUS_QUERY, {"owner": owner, "name": name, "appId": GITHUB_ACTIONS_APP_ID})
+    except GraphQLError as e:
+        print(Fore.YELLOW + f"⚠️  GraphQL status query failed ({e}). Falling back to the REST API.")
+        ctx.use_graphql = False
+        return None
+
+    repo = data.get('repository') or {}
+    target = (repo.get('defaultBranchRef') or {}).get('target') or {}
     workflow_run = None
-    while time.time() - start_time < build_timeout:
-        # Get the list of workflows
-        workflows = repository.get_workflows()
-        if workflows.totalCount == 0:
-            print(Fore.YELLOW + "⚠️  No workflows found in the repository yet. Waiting...")
-            time.sleep(poll_interval)
-            continue
+    for suite in reversed((target.get('checkSuites') or {}).get('nodes') or []):
+        run = suite.get('workflowRun') or {}
+        if run_id is not None:
+            matches = run.get('databaseId') == run_id
+        else:
+            matches = ((run.get('file') or {}).get('path') or '').endswith(f"/{workflow_file}")
+        if matches:
+            workflow_run = {
+                'id': run['databaseId'],
+                'status': suite['status'].lower(),
+                'conclusion': (suite['conclusion'] or '').lower() or None,
+            }
+            break
+    release = repo.get('latestRelease') or {}
+    assets = [
+        {'name': asset['name'], 'browser_download_url': asset['downloadUrl']}
+        for asset in (release.get('releaseAssets') or {}).get('nodes') or []
+    ]
+    return {'run': workflow_run, 'assets': assets}
+
+# Build durations are kept for a repository until it has not been built for this long.
+BUILD_HISTORY_TTL = 90 * 24 * 60 * 60
+BUILD_HISTORY_SIZE = 20
+
+def build_history(repository, ctx):
+    """Return the cache holding the durations of earlier builds, and this repository's key in it."""
+    cache = ProbeCache(os.path.join(get_cache_dir(), 'build_history.json'), ttl=BUILD_HISTORY_TTL)
+    return cache, f"{ctx.api_url}|{repository['id']}|{WORKFLOW_FILE}"
+
+def record_build_duration(repository, ctx, seconds):
+    cache, key = build_history(repository, ctx)
+    durations = (cache.get(key) or []) + [round(seconds, 1)]
+    cache.put(key, durations[-BUILD_HISTORY_SIZE:])
+    cache.save()
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class PollSchedule:
+    """Chooses how long to wait before the next status poll of a build.
+
+    Queued runs are polled quickly, backing off towards ``poll_interval``,
+    so the start of the build is noticed promptly. Without earlier
+    ``durations`` a running build is polled every ``poll_interval``. With
+    them, it is left alone until shortly before the fastest earlier build
+    would have finished, polled densely until the median duration has
+    passed, and every ``poll_interval`` after that. ``max_wait`` bounds the
+    quiet stretch at the start, so a failing build is still noticed early.
+    """
 
-        # Find the workflow by name
-        workflow = next((wf for wf in workflows if wf.name == "iOS Build"), None)
-        if not workflow:
-            print(Fore.YELLOW + "⚠️  Workflow 'iOS Build' not found. Waiting...")
-            time.sleep(poll_interval)
-            continue
+    QUICK_INTERVAL = 5
+
+    def __init__(self, poll_interval, durations=(), max_wait=None):
+        import statistics
+
+        self.poll_interval = poll_interval
+        self.predicted = statistics.median(durations) if durations else None
+        self.earliest = 0.9 * min(durations) if durations else None
+        self.max_wait = max_wait
+        self.started = None
+        self.quick = min(self.QUICK_INTERVAL, poll_interval)
+
+    def observe(self, status):
+        """Note the run's status; the first in_progress sighting starts the clock."""
+        if status == "in_progress" and self.started is None:
+            self.started = time.time()
+
+    def elapsed(self):
+        return time.time() - self.started if self.started is not None else None
+
+    def eta(self):
+        """Seconds until the predicted finish, or None without a prediction."""
+        if self.predicted is None or self.started is None:
+            return None
+        return max(0, self.predicted - self.elapsed())
+
+    def next_interval(self, status):
+        if status != "in_progress":
+            interval = self.quick
+            self.quick = min(self.poll_interval, self.quick * 1.5)
+            return interval
+        if self.predicted is None:
+            return self.poll_interval
+        elapsed = self.elapsed()
+        if elapsed < self.earliest:
+            wait = self.earliest - elapsed
+            return min(wait, self.max_wait) if self.max_wait else wait
+        if elapsed < self.predicted:
+            # Spread a handful of polls over the window in which earlier builds finished.
+            return min(self.poll_interval, max(self.QUICK_INTERVAL, (self.predicted - self.earliest) / 8))
+        return self.poll_interval
+
+# Longest quiet stretch while a build runs, so a failed step is noticed within about a
+# minute even when earlier builds predict a long wait.
+FAILURE_CHECK_INTERVAL = 60
+
+# With webhooks, polling is only a safety net for deliveries that never arrive.
+WEBHOOK_FALLBACK_INTERVAL = 120
+
+class WebhookReceiver:
+    """Local listener for GitHub ``workflow_run`` and ``release`` webhooks.
+
+    Deliveries are only accepted with a valid X-Hub-Signature-256 for
+    ``secret``. Each accepted event wakes ``wait``, so the pipeline reacts as
+    soon as GitHub reports progress instead of at the next poll. The latest
+    ``workflow_run`` payload of every run is kept for the waiting loop.
+    """
 
-        # Get the runs for the workflow
-        runs = workflow.get_runs(branch="main")
-        if runs.totalCount == 0:
-            print(Fore.YELLOW + "⚠️  No workflow runs found. Waiting for the workflow to start...")
-            time.sleep(poll_interval)
+    EVENTS = ('workflow_run', 'release')
+    # GitHub caps webhook payloads at 25 MB; anything larger is not from GitHub.
+    MAX_BODY = 25 * 1024 * 1024
+
+    def __init__(self, port, secret, host=''):
+        self.port = port
+        self.host = host
+        self.secret = secret.encode('utf-8')
+        self.runs = {}
+        self.received = 0
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def verify(self, body, signature):
+        import hashlib
+        import hmac
+
+        expected = b"sha256=" + hmac.new(self.secret, body, hashlib.sha256).hexdigest().encode('ascii')
+        try:
+            # http.server decodes headers as latin-1, so this restores the bytes that were sent.
+            received = (signature or "").encode('latin-1')
+        except UnicodeEncodeError:
+            return False
+        return hmac.compare_digest(expected, received)
+
+    def deliver(self, event, body, signature):
+        """Handle one delivery and return the HTTP status to answer with."""
+        if not self.verify(body, signature):
+            return 401
+        if event not in self.EVENTS:
+            # Includes the ping GitHub sends when a hook is created.
+            return 204
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400
+        run = payload.get('workflow_run') or {}
+        with self._lock:
+            previous = self.runs.get(run.get('id'))
+            # Deliveries can arrive out of order; a completed run stays completed.
+            if run.get('id') and not (previous and previous.get('status') == "completed"):
+                self.runs[run['id']] = run
+            self.received += 1
+        self._event.set()
+        return 204
+
+    def find_run(self, run_id=None, dispatch_id=None):
+        """Latest reported state of run ``run_id``, or of the run named after ``dispatch_id``."""
+        with self._lock:
+            if run_id is not None:
+                return self.runs.get(run_id)
+            return next((run for run in self.runs.values() if dispatch_id in (run.get('display_title') or '')), None)
+
+    def wait(self, timeout):
+        """Sleep until the next event or for ``timeout`` seconds; return True if woken by an event."""
+        woken = self._event.wait(timeout)
+        self._event.clear()
+        return woken
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= receiver.MAX_BODY:
+                    # Answer without reading the body, and drop the connection.
+                    self.close_connection = True
+                    status = 413 if length > receiver.MAX_BODY else 400
+                else:
+                    body = self.rfile.read(length)
+                    status = receiver.deliver(self.headers.get('X-GitHub-Event'), body, self.headers.get('X-Hub-Signature-256'))
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="webhook", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+def register_webhook(repository, ctx, url, secret):
+    """Create a repository hook that delivers to ``url``; return its ID, or None on failure."""
+    data = {
+        "name": "web",
+        "active": True,
+        "events": list(WebhookReceiver.EVENTS),
+        "config": {"url": url, "content_type": "json", "secret": secret, "insecure_ssl": "0"}
+    }
+    response = ctx.request("POST", f"{ctx.api_url}/repos/{repository['full_name']}/hooks", json=data)
+    if response.status_code == 201:
+        print(Fore.GREEN + f"✔ Webhook registered for {url}.")
+        return response.json()['id']
+    print(Fore.YELLOW + f"⚠️  Could not register the webhook ({response.status_code}); falling back to polling.")
+    return None
+
+def delete_webhook(repository, ctx, hook_id):
+    response = ctx.request("DELETE", f"{ctx.api_url}/repos/{repository['full_name']}/hooks/{hook_id}")
+    if response.status_code not in (204, 404):
+        print(Fore.YELLOW + f"⚠️  Could not remove webhook {hook_id}: {response.status_code} - {response.text}")
+
+def fetch_run_jobs(repository, ctx, run_id):
+    """Jobs of the latest attempt of a run, each with its steps.
+
+    The first page is revalidated with its ETag, so a poll while nothing has
+    changed is answered with 304 Not Modified and costs no quota. Further
+    pages are only fetched for runs with more than 100 jobs.
+    """
+    url = f"{ctx.api_url}/repos/{repository['full_name']}/actions/runs/{run_id}/jobs"
+    page = ctx.get_json(url, params={'filter': 'latest', 'per_page': 100})
+    jobs = page.get('jobs', [])
+    if page.get('total_count', 0) > len(jobs):
+        jobs = list(ctx.paginate(url, 'jobs', params={'filter': 'latest'}))
+    return jobs
+
+# How often, and how many times, a failed job is checked for having finished before its log is fetched.
+FAILED_JOB_CHECK_INTERVAL = 2
+FAILED_JOB_CHECKS = 15
+
+def wait_for_job_completion(repository, ctx, run_id, job):
+    """Return ``job`` once it has completed, or as last seen if it takes too long.
+
+    GitHub only serves a job's log after the job has finished, which takes
+    a moment after a step has failed. The wait is bounded by a number of
+    checks rather than by time, so a replayed cassette makes the same requests.
+    """
+    if job['status'] == "completed":
+        return job
+    print(Fore.YELLOW + f"⏳ Waiting for job '{job['name']}' to finish so its log can be shown...")
+    for _ in range(FAILED_JOB_CHECKS):
+        ctx.sleep(FAILED_JOB_CHECK_INTERVAL)
+        latest = next((candidate for candidate in fetch_run_jobs(repository, ctx, run_id) if candidate['id'] == job['id']), None)
+        if latest is None:
+            break
+        job = latest
+        if job['status'] == "completed":
+            break
+    return job
+
+def cancel_workflow_run(repository, ctx, run_id):
+    response = ctx.request("POST", f"{ctx.api_url}/repos/{repository['full_name']}/actions/runs/{run_id}/cancel")
+    if response.status_code == 202:
+        print(Fore.GREEN + f"✔ Cancelled workflow run {run_id} to free its runner.")
+    else:
+        # 409 means the run finished on its own in the meantime.
+        print(Fore.YELLOW + f"⚠️  Could not cancel workflow run {run_id}: {response.status_code} - {response.text}")
+
+class StepProgress:
+    """Prints the steps of a run's jobs as they start and finish.
+
+    ``update`` is called with every fresh jobs listing and only prints what
+    changed since the previous one. The first step that concludes with
+    ``failure`` is kept in ``failed`` as a (job, step) pair.
+    """
+
+    def __init__(self):
+        self.seen = {}
+        self.failed = None
+
+    def update(self, jobs):
+        for job in jobs:
+            prefix = f"{job['name']}: " if len(jobs) > 1 else ""
+            for step in job.get('steps') or []:
+                state = (step['status'], step.get('conclusion'))
+                key = (job['id'], step['number'])
+                if self.seen.get(key) == state:
+                    continue
+                self.seen[key] = state
+                name = prefix + step['name']
+                if step['status'] == "in_progress":
+                    print(Fore.CYAN + f"   ▶ {name}")
+                elif step['status'] != "completed":
+                    continue
+                elif step['conclusion'] == "failure":
+                    print(Fore.RED + f"   ✘ {name}")
+                    if self.failed is None:
+                        self.failed = (job, step)
+                elif step['conclusion'] == "skipped":
+                    print(Fore.WHITE + f"   - {name} (skipped)")
+                else:
+                    took = ""
+                    if step.get('started_at') and step.get('completed_at'):
+                        seconds = parse_github_timestamp(step['completed_at']) - parse_github_timestamp(step['started_at'])
+                        took = f" ({format_duration(seconds)})"
+                    print(Fore.GREEN + f"   ✔ {name}{took}")
+
+class LogTail:
+    """Prints a job's log as far as the server has it.
+
+    Each ``poll`` asks only for the bytes after those already printed, with
+    a Range request, and prints the complete lines among them. A trailing
+    partial line is held back until it is finished, or until the final poll
+    after the job has completed. github.com only serves the log of a
+    finished job, so there the whole log usually arrives with the final poll.
+    """
+
+    def __init__(self, repository, ctx, job):
+        self.ctx = ctx
+        self.url = f"{ctx.api_url}/repos/{repository['full_name']}/actions/jobs/{job['id']}/logs"
+        self.name = job['name']
+        self.offset = 0
+        self.partial = b""
+        self.done = False
+        self.unavailable = False
+
+    def poll(self, final=False):
+        if self.unavailable and not final:
+            # No log while the job runs; ask again once it has finished.
+            return
+        headers = {"Range": f"bytes={self.offset}-"} if self.offset else {}
+        with self.ctx.request("GET", self.url, headers=headers) as response:
+            if response.status_code == 206:
+                # Content-Range: bytes <first>-<last>/<total>
+                match = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+                skip = self.offset - int(match.group(1)) if match else 0
+                data = response.content[max(0, skip):]
+            elif response.status_code == 200:
+                # The server ignored the Range header and sent everything again.
+                data = response.content[self.offset:]
+            else:
+                # 416: nothing new yet. 404: the log is not available (yet).
+                data = b""
+                if response.status_code == 404 and not final and not self.unavailable:
+                    self.unavailable = True
+                    print(Fore.CYAN + f"ℹ️  The log of job '{self.name}' is not available while it runs; it is printed when the job finishes.")
+                elif response.status_code == 404 and final:
+                    print(Fore.YELLOW + f"⚠️  The log of job '{self.name}' is not available.")
+        self.offset += len(data)
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        if final:
+            self.done = True
+            if self.partial:
+                lines.append(self.partial)
+                self.partial = b""
+        for line in lines:
+            print(Fore.WHITE + "   │ " + line.decode("utf-8", errors="replace").rstrip("\r"))
+
+def wait_for_workflow_completion(repository, ctx, dispatch, build_timeout, poll_interval, verbose=False, webhook=None,
+                                 adaptive=True, cancel_on_failure=False, tail_logs=False, log_context=3):
+    """Poll the run started by ``dispatch`` until it finishes.
+
+    With ``adaptive`` polling, the durations of earlier successful builds of
+    the repository decide when to poll (see PollSchedule), and the duration
+    of this build is added to them. While the run is in progress its jobs
+    are polled instead of the run, which shows step-by-step progress and
+    stops the wait as soon as a step fails (cancelling the run with
+    ``cancel_on_failure``). To notice failures, a running build is polled
+    at least every FAILURE_CHECK_INTERVAL seconds, or every ``poll_interval``
+    seconds with ``cancel_on_failure``. With ``tail_logs`` the jobs' logs
+    are printed as far as the server has them at every poll (see LogTail). With
+    ``verbose``, a failed build prints only the log of the failing step,
+    ``log_context`` lines around each known error. With a ``webhook``
+    receiver, each delivery wakes the loop immediately and its payload is
+    used instead of a poll; until the build starts, polling continues at a
+    longer interval in case deliveries do not arrive. Returns the latest release
+    assets if the final poll already brought them along (GraphQL), otherwise
+    None.
+    """
+    print(Fore.YELLOW + "⏳ Waiting for the GitHub Actions workflow to start...")
+    runs_url = f"{ctx.api_url}/repos/{repository['full_name']}/actions/runs"
+    requests_before, quota_before = ctx.requests_made, ctx.quota_used
+    start_time = time.time()
+    run_id = None
+    progress = StepProgress()
+    tails = {}
+    history, history_key = build_history(repository, ctx)
+    # Replayed builds take however long the time scale makes them, so they neither use nor extend the history.
+    use_history = adaptive and not ctx.replaying
+    # Zero durations were written by replays of older versions.
+    durations = [seconds for seconds in history.get(history_key) or [] if seconds > 0] if use_history else []
+    # A long quiet stretch saves requests but delays noticing a failed step. When the
+    # user asked to cancel failed builds, poll at the normal rate. Following the logs
+    # does not need it: GitHub only has the log of a job once the job has finished.
+    max_wait = poll_interval if cancel_on_failure else max(poll_interval, FAILURE_CHECK_INTERVAL)
+    schedule = PollSchedule(poll_interval, durations, max_wait=max_wait)
+    if schedule.predicted is not None:
+        print(Fore.CYAN + f"ℹ️  Earlier builds took {format_duration(schedule.predicted)} "
+                          f"(median of {len(durations)}); polling around the expected finish.")
+
+    def pause(interval):
+        # Returns whether a webhook delivery cut the wait short.
+        if webhook is None:
+            ctx.sleep(interval)
+            return False
+        if schedule.started is None:
+            interval = max(interval, WEBHOOK_FALLBACK_INTERVAL)
+        # Deliveries do not report failed steps, so a running build's jobs are still polled on schedule.
+        return webhook.wait(interval)
+
+    # Deliveries may already have arrived between the dispatch and now.
+    woken = webhook is not None
+    while time.time() - start_time < build_timeout:
+        release_assets = None
+        scheduler = ctx.scheduler
+        delivered_run = webhook.find_run(run_id, dispatch['id']) if woken else None
+        if delivered_run is not None:
+            workflow_run = delivered_run
+            if run_id is None:
+                run_id = workflow_run['id']
+                print(Fore.GREEN + f"✔ Found workflow run {run_id} for this dispatch.")
+        elif run_id is None:
+            workflow_run = find_dispatched_run(repository, ctx, dispatch)
+            if workflow_run is None:
+                print(Fore.YELLOW + "⚠️  The dispatched workflow run has not appeared yet. Waiting...")
+                woken = pause(schedule.next_interval(None))
+                continue
+            run_id = workflow_run['id']
+            print(Fore.GREEN + f"✔ Found workflow run {run_id} for this dispatch.")
+        else:
+            workflow_run = None
+            if schedule.started is not None:
+                # Once the build runs, its jobs show progress and failures as they happen;
+                # the run itself is only polled again when every job has finished.
+                jobs = fetch_run_jobs(repository, ctx, run_id)
+                if tail_logs:
+                    for job in jobs:
+                        tail = tails.get(job['id'])
+                        if job['status'] == "queued" or (tail is not None and tail.done):
+                            continue
+                        if tail is None:
+                            tail = tails[job['id']] = LogTail(repository, ctx, job)
+                        tail.poll(final=job['status'] == "completed")
+                progress.update(jobs)
+                if progress.failed is not None:
+                    job, step = progress.failed
+                    print(Fore.RED + f"✘ Step '{step['name']}' of job '{job['name']}' failed, so the build cannot succeed.")
+                    if job.get('html_url'):
+                        print(Fore.RED + f"   See {job['html_url']}")
+                    if cancel_on_failure:
+                        cancel_workflow_run(repository, ctx, run_id)
+                    if verbose:
+                        job = wait_for_job_completion(repository, ctx, run_id, job)
+                        show_failed_step_log(repository, ctx, run_id, job, step, log_context, run_completed=False)
+                    sys.exit(1)
+                if any(job['status'] != "completed" for job in jobs):
+                    workflow_run = {'id': run_id, 'status': "in_progress", 'conclusion': None}
+            if workflow_run is None:
+                # From now on only this run is polled.
+                status = fetch_build_status(repository, ctx, run_id=run_id) if ctx.use_graphql else None
+                if status is not None and status['run'] is not None:
+                    workflow_run, release_assets = status['run'], status['assets']
+                    scheduler = ctx.graphql_scheduler
+                else:
+                    workflow_run = ctx.get_json(f"{runs_url}/{run_id}")
+        schedule.observe(workflow_run['status'])
+        if workflow_run['status'] != "completed":
+            eta = schedule.eta()
+            eta_note = f" (ETA {format_duration(eta)})" if eta is not None else ""
+            print(Fore.YELLOW + f"⏳ Workflow run {workflow_run['id']} is in status '{workflow_run['status']}'{eta_note}. Waiting for completion...")
+            planned = schedule.next_interval(workflow_run['status'])
+            # Slow down before the rate limit runs out rather than hitting it.
+            interval = scheduler.poll_interval(planned)
+            if interval > planned and verbose:
+                budget = scheduler.budget()
+                print(Fore.YELLOW + f"⚠️  {budget['remaining']} API requests left until the rate limit resets; polling every {interval:.0f}s.")
+            # Do not sleep past the build timeout.
+            woken = pause(max(0, min(interval, build_timeout - (time.time() - start_time))))
             continue
 
-        # Get the latest run
-        workflow_run = runs[0]
-        if workflow_run.status != "completed":
-            print(Fore.YELLOW + f"⏳ Workflow run {workflow_run.id} is in status '{workflow_run.status}'. Waiting for completion...")
-            time.sleep(poll_interval)
+        if verbose:
+            requests_made = ctx.requests_made - requests_before
+            quota_used = ctx.quota_used - quota_before
+            print(Fore.CYAN + f"ℹ️  Polling used {requests_made} requests, {quota_used} of them counted against the rate limit; the rest were answered 304 Not Modified.")
+            if webhook is not None:
+                print(Fore.CYAN + f"ℹ️  Received {webhook.received} webhook deliveries.")
+        if workflow_run['conclusion'] == "success":
+            print(Fore.GREEN + "✔ GitHub Actions workflow completed successfully.")
+            if schedule.started is not None and not ctx.replaying:
+                duration = schedule.elapsed()
+                if verbose and schedule.predicted is not None:
+                    print(Fore.CYAN + f"ℹ️  The build took {format_duration(duration)}; predicted {format_duration(schedule.predicted)}.")
+                # Failed builds usually stop early, so only successful ones shape the prediction.
+                record_build_duration(repository, ctx, duration)
+            if verbose:
+                download_and_display_workflow_logs(repository, workflow_run['id'], ctx)
+            return release_assets
         else:
-            if workflow_run.conclusion == "success":
-                print(Fore.GREEN + "✔ GitHub Actions workflow completed successfully.")
-                if verbose:
-                    download_and_display_workflow_logs(repository, workflow_run.id, github_token)
-                return
-            else:
-                print(Fore.RED + f"✘ GitHub Actions workflow failed with conclusion: {workflow_run.conclusion}")
-                if verbose:
-                    download_and_display_workflow_logs(repository, workflow_run.id, github_token)
-                sys.exit(1)
+            print(Fore.RED + f"✘ GitHub Actions workflow failed with conclusion: {workflow_run['conclusion']}")
+            if progress.failed is None and workflow_run['conclusion'] == "failure":
+                progress.update(fetch_run_jobs(repository, ctx, workflow_run['id']))
+            if verbose and progress.failed is not None:
+                job, step = progress.failed
+                show_failed_step_log(repository, ctx, workflow_run['id'], job, step, log_context)
+            elif verbose:
+                download_and_display_workflow_logs(repository, workflow_run['id'], ctx)
+            sys.exit(1)
     print(Fore.RED + "✘ Timeout reached. The GitHub Actions workflow did not complete within the expected time.")
     sys.exit(1)
 
-def download_and_display_workflow_logs(repository, run_id, github_token):
+def fetch_logs_archive(repository, run_id, ctx, path):
+    """Stream a run's logs archive to ``path``; False (after saying why) if it is unavailable."""
+    import requests
+    import zipfile
+
+    logs_url = f"{ctx.api_url}/repos/{repository['full_name']}/actions/runs/{run_id}/logs"
+    try:
+        ctx.download(logs_url, path)
+    except requests.HTTPError as e:
+        print(Fore.RED + f"✘ Failed to download workflow logs: {e.response.status_code} - {e.response.reason}")
+        return False
+    if not zipfile.is_zipfile(path):
+        # Cassettes keep only the size of large bodies, so replayed archives are zero bytes.
+        note = " (large bodies are not stored in cassettes)" if ctx.replaying else ""
+        print(Fore.RED + f"✘ The downloaded workflow logs are not a zip archive{note}.")
+        return False
+    return True
+
+def download_and_display_workflow_logs(repository, run_id, ctx):
+    """Print every file of a run's logs archive.
+
+    The archive is streamed to a temporary file and each member is decoded
+    and printed line by line, so memory use does not grow with the size of
+    the logs.
+    """
+    import io
+    import zipfile
+
     print(Fore.YELLOW + "⚠️  Downloading workflow logs...")
-    logs_url = f"https://api.github.com/repos/{repository.full_name}/actions/runs/{run_id}/logs"
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    response = requests.get(logs_url, headers=headers)
-    if response.status_code == 200:
-        with zipfile.ZipFile(io.BytesIO(response.content)) as thezip:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive_path = os.path.join(temp_dir, 'logs.zip')
+        if not fetch_logs_archive(repository, run_id, ctx, archive_path):
+            return
+        with zipfile.ZipFile(archive_path) as thezip:
             for zipinfo in thezip.infolist():
+                print(Fore.CYAN + f"\n--- Log file: {zipinfo.filename} ---")
                 with thezip.open(zipinfo) as thefile:
-                    print(Fore.CYAN + f"\n--- Log file: {zipinfo.filename} ---")
-                    log_content = thefile.read().decode('utf-8', errors='ignore')
-                    print(Fore.WHITE + log_content)
-    else:
-        print(Fore.RED + f"✘ Failed to download workflow logs: {response.status_code} - {response.text}")
-
-def download_ipa(repo, builds_dir, ipa_name, verbose=False):
-    import requests
-
-    print(Fore.YELLOW + "⚠️  Fetching the latest release from the repository...")
-    releases = repo.get_releases()
-    if releases.totalCount == 0:
-        print(Fore.RED + "✘ No releases found.")
-        sys.exit(1)
-    latest_release = releases[0]
-    assets = latest_release.get_assets()
+                    # TextIOWrapper decodes incrementally, so a character split across reads stays intact.
+                    for line in io.TextIOWrapper(thefile, encoding='utf-8', errors='ignore'):
+                        print(Fore.WHITE + line.rstrip('\n'))
+
+# Lines that explain why an iOS build failed: (group name, label, pattern).
+FAILURE_SIGNATURES = [
+    ('xcodebuild', 'xcodebuild', r"\berror: |\*\* (?:BUILD|ARCHIVE) FAILED \*\*|Error \(Xcode\): "),
+    ('cocoapods', 'CocoaPods', r"\[!\] |CocoaPods could not find compatible versions|Unable to find a specification for"),
+    ('dart', 'Dart', r"\.dart:\d+:\d+: Error: |Error: Couldn't resolve the package|Target kernel_snapshot failed"),
+    ('actions', 'GitHub Actions', r"##\[error\]"),
+]
+FAILURE_PATTERN = re.compile('|'.join(f"(?P<{name}>{pattern})" for name, _, pattern in FAILURE_SIGNATURES))
+FAILURE_LABELS = {name: label for name, label, _ in FAILURE_SIGNATURES}
+# Lines of the step shown when none of them matches a known signature.
+FAILURE_TAIL_LINES = 30
+
+def print_failure_excerpt(lines, context=3):
+    """Print the lines of a failed step's log that match FAILURE_PATTERN.
+
+    Each match is shown with ``context`` lines on either side; if nothing
+    matches, the last FAILURE_TAIL_LINES lines are shown instead. Only the
+    lines that may still be printed are kept, so ``lines`` can be a stream
+    of any length. Returns a Counter of matches per signature.
+    """
+    counts = collections.Counter()
+    before = collections.deque(maxlen=context)
+    tail = collections.deque(maxlen=FAILURE_TAIL_LINES)
+    last_printed = -1
+    after = 0
+
+    def show(number, line, color=Fore.WHITE):
+        nonlocal last_printed
+        if last_printed >= 0 and number > last_printed + 1:
+            print(Fore.WHITE + "   ...")
+        print(color + "   " + line)
+        last_printed = number
+
+    for number, line in enumerate(lines):
+        line = line.rstrip('\r\n')
+        tail.append((number, line))
+        match = FAILURE_PATTERN.search(line)
+        if match:
+            counts[match.lastgroup] += 1
+            for earlier in before:
+                show(*earlier)
+            before.clear()
+            show(number, line, Fore.RED)
+            after = context
+        elif after:
+            show(number, line)
+            after -= 1
+        else:
+            before.append((number, line))
+    if not counts:
+        print(Fore.YELLOW + f"⚠️  No known error found in the step's log; its last {FAILURE_TAIL_LINES} lines:")
+        for number, line in tail:
+            show(number, line)
+    return counts
+
+def job_log_lines(repository, ctx, job, step):
+    """Stream the lines of ``job``'s log written while ``step`` ran, or None if the log is unavailable.
+
+    The jobs API gives each step's start and end time, and every log line
+    starts with a timestamp, so the step's segment can be cut out of the
+    job's single log file.
+    """
+    import calendar
+
+    url = f"{ctx.api_url}/repos/{repository['full_name']}/actions/jobs/{job['id']}/logs"
+    response = ctx.request("GET", url, stream=True)
+    if response.status_code != 200 or not step.get('started_at'):
+        response.close()
+        return None
+    start = int(parse_github_timestamp(step['started_at']))
+    end = parse_github_timestamp(step['completed_at']) if step.get('completed_at') else float('inf')
+
+    def lines():
+        inside = False
+        with response:
+            for raw in response.iter_lines():
+                line = raw.decode('utf-8', errors='replace')
+                try:
+                    logged = calendar.timegm(time.strptime(line[:19], '%Y-%m-%dT%H:%M:%S'))
+                except ValueError:
+                    # Lines without a timestamp continue the previous one.
+                    logged = None
+                if logged is not None:
+                    if logged > end:
+                        break
+                    inside = logged >= start
+                if inside:
+                    yield line
+    return lines()
+
+def show_failed_step_log(repository, ctx, run_id, job, step, context=3, run_completed=True):
+    """Print the part of the logs that explains why ``step`` of ``job`` failed.
+
+    Once the run has completed, the step's own file in the run's logs
+    archive is used. Before that (or if the archive has no such file), the
+    step's lines are cut out of the job's log.
+    """
+    import io
+    import zipfile
+
+    print(Fore.CYAN + f"\n--- Log of the failed step: {job['name']} / {step['name']} ---")
+    counts = None
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive_path = os.path.join(temp_dir, 'logs.zip')
+        if run_completed and fetch_logs_archive(repository, run_id, ctx, archive_path):
+            with zipfile.ZipFile(archive_path) as thezip:
+                # Steps are stored as "<job name>/<step number>_<step name>.txt".
+                prefix = f"{job['name']}/{step['number']}_"
+                member = next((info for info in thezip.infolist() if info.filename.startswith(prefix)), None)
+                if member is not None:
+                    with thezip.open(member) as thefile:
+                        counts = print_failure_excerpt(io.TextIOWrapper(thefile, encoding='utf-8', errors='replace'), context)
+    if counts is None:
+        lines = job_log_lines(repository, ctx, job, step)
+        if lines is None:
+            print(Fore.YELLOW + f"⚠️  The job's log is not available yet. See {job.get('html_url', 'the run on GitHub')}.")
+            return
+        counts = print_failure_excerpt(lines, context)
+    if counts:
+        found = ", ".join(f"{count} {FAILURE_LABELS[name]}" for name, count in counts.most_common())
+        print(Fore.CYAN + f"ℹ️  Known errors found: {found}.")
+
+def download_ipa(repo, ctx, builds_dir, ipa_name, verbose=False, assets=None):
+    """Download the IPA from the latest release; ``assets`` skips the release lookup."""
+    if assets is None:
+        print(Fore.YELLOW + "⚠️  Fetching the latest release from the repository...")
+        # Releases are listed newest first and already include their assets.
+        releases = ctx.get_json(f"{ctx.api_url}/repos/{repo['full_name']}/releases", params={'per_page': 1})
+        if not releases:
+            print(Fore.RED + "✘ No releases found.")
+            sys.exit(1)
+        assets = releases[0].get('assets', [])
     ipa_asset = None
     for asset in assets:
-        if asset.name.endswith(".ipa"):
+        if asset['name'].endswith(".ipa"):
             ipa_asset = asset
             break
     if not ipa_asset:
         print(Fore.RED + "✘ No IPA file found in the latest release.")
         sys.exit(1)
-    download_url = ipa_asset.browser_download_url
+    download_url = ipa_asset['browser_download_url']
     print(Fore.GREEN + f"✔ IPA download URL: {download_url}")
     os.makedirs(builds_dir, exist_ok=True)
     ipa_path = os.path.join(builds_dir, ipa_name)
     print(Fore.YELLOW + f"⚠️  Downloading the IPA file to '{ipa_path}'...")
     try:
-        with requests.get(download_url, stream=True) as r:
-            r.raise_for_status()
-            with open(ipa_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        ctx.download(download_url, ipa_path)
         print(Fore.GREEN + f"✔ IPA successfully downloaded and saved to '{ipa_path}'.")
     except Exception as e:
         print(Fore.RED + f"✘ Error downloading the IPA file: {e}")
@@ -426,9 +2393,15 @@ def download_ipa(repo, builds_dir, ipa_name, verbose=False):
 def get_workflow_yaml(ipa_name):
     yaml_content = f"""
     name: iOS Build
+    run-name: iOS Build ${{{{ inputs.dispatch_id }}}}
 
     on:
       workflow_dispatch:
+        inputs:
+          dispatch_id:
+            description: 'Unique ID the compiler uses to find the run it dispatched'
+            required: false
+            default: ''
 
     permissions:
       contents: write  # Grants read and write permissions to GITHUB_TOKEN
@@ -472,32 +2445,254 @@ def get_workflow_yaml(ipa_name):
     """
     return textwrap.dedent(yaml_content)
 
-def check_and_install_dependencies(verbose=False):
-    check_and_install_git(verbose=verbose)
-    check_and_install_gh(verbose=verbose)
-    install_python_packages(verbose=verbose)
+def check_and_install_dependencies(verbose=False, refresh=False):
+    cache = ProbeCache(refresh=refresh)
+    probes = {
+        'git': ["git", "--version"],
+        'gh': ["gh", "--version"],
+        'gh-auth': ["gh", "auth", "status"],
+    }
+    keys = {
+        'git': tool_probe_key('git'),
+        'gh': tool_probe_key('gh'),
+        'gh-auth': tool_probe_key('gh', gh_hosts_file()),
+    }
+    results = {}
+    for name in probes:
+        cached = cache.get(keys[name])
+        if cached is not None:
+            results[name] = (cached['returncode'], cached['output'], '')
+    uncached = {name: command for name, command in probes.items() if name not in results}
+    if uncached:
+        # The probes are independent, so run them side by side.
+        results.update(run_commands_concurrently(uncached, verbose=verbose, check=False))
+    elif verbose:
+        print(Fore.GREEN + "✔ Using cached dependency probe results.")
+
+    # Collect everything that is missing first so it is installed in one go.
+    missing = []
+    if not check_git(verbose=verbose, probe=results['git']):
+        missing.append("git")
+    gh_installed = check_gh(verbose=verbose, probe=results['gh'])
+    if not gh_installed:
+        missing.append("gh")
+    install_system_packages(missing, verbose=verbose)
+    if gh_installed:
+        check_gh_auth(verbose=verbose, auth_probe=results['gh-auth'])
+    else:
+        print(Fore.YELLOW + "⚠️  Please authenticate GitHub CLI.")
+        authenticate_gh(verbose=verbose)
+    install_python_packages(verbose=verbose, cache=cache)
+
+    for name in uncached:
+        returncode, output, _ = results[name]
+        if returncode == 0:
+            cache.put(keys[name], {'returncode': returncode, 'output': str(output)})
+        output.close()
+    cache.save()
 
-def delete_old_workflow_runs(repo, github_token, verbose=False):
-    from github import Github
+def parse_github_timestamp(value):
+    """Seconds since the epoch for a GitHub timestamp.
+
+    Accepts both 2024-05-01T12:00:00Z and the 2020-01-20T09:42:40.000-08:00
+    form the jobs API may use for steps.
+    """
+    from datetime import datetime
+
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+class RetentionPolicy:
+    """Decides which workflow runs to keep when old runs are cleaned up.
+
+    A run is kept if it is one of the ``keep_runs`` newest runs, if it is
+    younger than ``keep_days`` days, or, with ``keep_failures``, if it failed.
+    Everything else is deleted; ``keep_runs=0`` and no other rule deletes all
+    runs.
+    """
+
+    FAILED_CONCLUSIONS = {'failure', 'timed_out', 'startup_failure'}
+
+    def __init__(self, keep_runs=20, keep_days=None, keep_failures=False):
+        self.keep_runs = keep_runs
+        self.keep_days = keep_days
+        self.keep_failures = keep_failures
+
+    def keeps(self, run, rank, now):
+        if rank < self.keep_runs:
+            return True
+        if self.keep_days is not None and now - parse_github_timestamp(run['created_at']) < self.keep_days * 24 * 60 * 60:
+            return True
+        return self.keep_failures and run.get('conclusion') in self.FAILED_CONCLUSIONS
+
+    def select(self, runs, now=None, newer=0):
+        """Return the runs to delete, given the runs of a repository.
+
+        ``newer`` runs that are newer than all of ``runs`` were left out of the
+        listing; they still count towards ``keep_runs``.
+        """
+        now = time.time() if now is None else now
+        newest_first = sorted(runs, key=lambda run: parse_github_timestamp(run['created_at']), reverse=True)
+        return [run for rank, run in enumerate(newest_first, newer) if not self.keeps(run, rank, now)]
+
+def delete_old_workflow_runs(repository, ctx, verbose=False, workers=8, policy=None):
+    """Delete the repository's workflow runs that ``policy`` does not keep.
+
+    Runs are listed 100 per page and deleted by a pool of ``workers`` threads;
+    every request still goes through the rate-limit scheduler. Runs created
+    after the listing started, such as a build dispatched while this runs in
+    the background, are left alone. With ``keep_days`` only runs older than
+    that are listed, so the listing does not grow with the runs it keeps
+    anyway; runs kept by ``keep_failures`` are listed by every cleanup.
+    """
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
 
     print(Fore.YELLOW + "⚠️  Deleting old workflow runs...")
-    g = Github(github_token)
-    user = g.get_user()
-    repository = g.get_repo(f"{user.login}/{repo.name}")
-    workflows = repository.get_workflows()
-
-    for workflow in workflows:
-        runs = workflow.get_runs()
-        for run in runs:
-            try:
-                run.delete()
+    runs_url = f"{ctx.api_url}/repos/{repository['full_name']}/actions/runs"
+    start = time.time()
+    policy = policy or RetentionPolicy()
+
+    # Collect the runs before deleting so deletions do not shift later pages.
+    params = {'per_page': 100}
+    if policy.keep_days is not None:
+        # Younger runs are kept anyway. The local clock is good enough here:
+        # which of the listed runs are old is still decided below.
+        until = time.gmtime(time.time() - policy.keep_days * 24 * 60 * 60)
+        params['created'] = f"<{time.strftime('%Y-%m-%dT%H:%M:%SZ', until)}"
+    response = ctx.request("GET", runs_url, params=params)
+    response.raise_for_status()
+    listed = response.json().get('total_count', 0)
+    # What counts as old is decided by GitHub's clock, not ours.
+    cutoff = time.time()
+    if response.headers.get("Date"):
+        from email.utils import parsedate_to_datetime
+
+        cutoff = parsedate_to_datetime(response.headers["Date"]).timestamp()
+    runs = {}
+    while True:
+        for run in response.json().get('workflow_runs', []):
+            # New runs push older ones onto the next page, where they show up again.
+            runs.setdefault(run['id'], run)
+        next_url = response.links.get("next", {}).get("url")
+        if not next_url:
+            break
+        response = ctx.request("GET", next_url)
+        response.raise_for_status()
+    newer = 0
+    if 'created' in params:
+        # The runs left out of the listing are kept, and take up places among the newest.
+        response = ctx.request("GET", runs_url, params={'per_page': 1})
+        response.raise_for_status()
+        newer = max(0, response.json().get('total_count', 0) - listed)
+    old_runs = policy.select(
+        [run for run in runs.values() if parse_github_timestamp(run['created_at']) < cutoff],
+        now=cutoff,
+        newer=newer
+    )
+
+    def delete(run):
+        try:
+            response = ctx.request("DELETE", f"{runs_url}/{run['id']}")
+        except requests.RequestException as e:
+            return run, None, str(e)
+        return run, response.status_code, response.text
+
+    deleted = failed = 0
+    with ThreadPoolExecutor(max_workers=workers, initializer=ctx.bind_stage, initargs=(ctx.current_stage,)) as pool:
+        for run, status_code, text in pool.map(delete, old_runs):
+            if status_code == 204:
+                deleted += 1
                 if verbose:
-                    print(Fore.YELLOW + f"⚠️  Deleted workflow run ID {run.id} for workflow '{workflow.name}'.")
-            except Exception as e:
-                print(Fore.RED + f"✘ Failed to delete workflow run ID {run.id}: {e}")
-    print(Fore.GREEN + "✔ All old workflow runs have been deleted.")
+                    print(Fore.YELLOW + f"⚠️  Deleted workflow run ID {run['id']} for workflow '{run['name']}'.")
+            else:
+                failed += 1
+                print(Fore.RED + f"✘ Failed to delete workflow run ID {run['id']}: {status_code} - {text}")
+
+    elapsed = time.time() - start
+    kept = len(runs) + newer - len(old_runs)
+    if not old_runs:
+        print(Fore.GREEN + f"✔ No old workflow runs to delete ({kept} kept).")
+    else:
+        print(Fore.GREEN + f"✔ Deleted {deleted} old workflow runs in {elapsed:.1f}s ({deleted / elapsed:.1f} runs/s), kept {kept}.")
+    if failed:
+        print(Fore.RED + f"✘ {failed} workflow runs could not be deleted.")
+    return {'deleted': deleted, 'failed': failed, 'seconds': elapsed}
+
+def start_background_cleanup(repository, ctx, verbose=False, workers=8, policy=None):
+    """Run delete_old_workflow_runs in a background thread and return the thread."""
+    import requests
+
+    def cleanup():
+        with ctx.stage("cleanup"):
+            try:
+                delete_old_workflow_runs(repository, ctx, verbose=verbose, workers=workers, policy=policy)
+            except requests.RequestException as e:
+                print(Fore.YELLOW + f"⚠️  Background cleanup of old workflow runs failed: {e}")
+
+    thread = threading.Thread(target=cleanup, name="cleanup", daemon=True)
+    thread.start()
+    return thread
+
+def wait_for_background_cleanup(thread):
+    """Wait for a thread from start_background_cleanup; Ctrl+C stops waiting."""
+    if thread.is_alive():
+        print(Fore.YELLOW + "⏳ Waiting for the cleanup of old workflow runs to finish...")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        print(Fore.YELLOW + "⚠️  Cleanup of old workflow runs was cut short; the remaining old runs will be deleted by the next cleanup.")
+        raise
+
+def print_startup_profile(limit=15):
+    """Report where startup time goes, in the style of ``python -X importtime``.
+
+    The CLI is started again with ``--help`` under ``-X importtime`` and the
+    top-level imports are listed by cumulative time. Frozen builds cannot pass
+    interpreter options, so there the lazily imported modules are timed
+    in-process instead.
+    """
+    rows = []
+    start = time.perf_counter()
+    if getattr(sys, 'frozen', False):
+        for module in ('requests', 'asyncio', 'zipfile'):
+            module_start = time.perf_counter()
+            try:
+                __import__(module)
+            except ImportError:
+                continue
+            elapsed = int((time.perf_counter() - module_start) * 1_000_000)
+            rows.append((module, elapsed, elapsed))
+    else:
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--help'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            fields = line[len('import time:'):].split('|')
+            if len(fields) != 3 or not fields[0].strip().isdigit():
+                continue
+            name = fields[2].rstrip()
+            # Nested imports are indented; only report what the script imported itself.
+            if name.startswith('  '):
+                continue
+            rows.append((name.strip(), int(fields[0]), int(fields[1])))
+    wall = time.perf_counter() - start
+
+    total = sum(cumulative for _, _, cumulative in rows)
+    print(Fore.CYAN + f"Startup profile: {wall * 1000:.1f}ms wall, {total / 1000:.1f}ms in {len(rows)} top-level imports")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_time, cumulative in sorted(rows, key=lambda row: row[2], reverse=True)[:limit]:
+        print(f"{cumulative / 1000:>10.1f}ms {self_time / 1000:>8.1f}ms  {name}")
 
 def main():
+    # Handled before argparse, which would otherwise insist on --action and --repo.
+    if '--startup-profile' in sys.argv[1:]:
+        print_startup_profile()
+        return
     print_ascii_art()
     parser = argparse.ArgumentParser(
         description="Automates the creation and management of GitHub repositories for Flutter iOS projects."
@@ -542,6 +2737,11 @@ def main():
         action='store_true',
         help='Skip checking and installing dependencies.'
     )
+    parser.add_argument(
+        '--refresh-deps',
+        action='store_true',
+        help='Ignore cached dependency probe results and probe again.'
+    )
     parser.add_argument(
         '--skip-build',
         action='store_true',
@@ -564,71 +2764,272 @@ def main():
         default=30,
         help='Polling interval in seconds (default: 30).'
     )
+    parser.add_argument(
+        '--keep-runs',
+        type=int,
+        default=20,
+        help='Number of most recent workflow runs to keep when cleaning up; 0 deletes all of them (default: 20).'
+    )
+    parser.add_argument(
+        '--keep-days',
+        type=int,
+        help='Also keep workflow runs created within this many days.'
+    )
+    parser.add_argument(
+        '--keep-failures',
+        action='store_true',
+        help='Also keep failed workflow runs.'
+    )
+    parser.add_argument(
+        '--cleanup-workers',
+        type=int,
+        default=8,
+        help='Number of parallel requests used to delete old workflow runs (default: 8).'
+    )
+    parser.add_argument(
+        '--background-cleanup',
+        action='store_true',
+        help='Delete old workflow runs in the background while the project is uploaded and built.'
+    )
+    parser.add_argument(
+        '--webhook-port',
+        type=int,
+        help='Listen on this port for workflow_run and release webhooks and react to them instead of waiting for the next poll.'
+    )
+    parser.add_argument(
+        '--webhook-secret',
+        type=str,
+        help='Secret used to verify webhook signatures (required with --webhook-port unless --webhook-url is given).'
+    )
+    parser.add_argument(
+        '--webhook-url',
+        type=str,
+        help='Public URL that forwards to --webhook-port; a repository webhook for it is created for the build and removed afterwards.'
+    )
+    parser.add_argument(
+        '--workflow-settle-time',
+        type=int,
+        default=20,
+        help='Seconds to wait after pushing the workflow file before dispatching it (default: 20).'
+    )
+    parser.add_argument(
+        '--api-url',
+        type=str,
+        default=GitHubContext.api_url,
+        help=f'Base URL of the GitHub REST API (default: "{GitHubContext.api_url}").'
+    )
+    parser.add_argument(
+        '--git-url',
+        type=str,
+        default=GitHubContext.git_url,
+        help=f'Base URL that repositories are pushed to (default: "{GitHubContext.git_url}").'
+    )
+    parser.add_argument(
+        '--stats-file',
+        type=str,
+        help='Write per-stage timings and API request counts to this JSON file.'
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        '--record',
+        type=str,
+        metavar='CASSETTE',
+        help='Record every GitHub API exchange of this run into a gzip-compressed cassette file.'
+    )
+    cassette_group.add_argument(
+        '--replay',
+        type=str,
+        metavar='CASSETTE',
+        help='Serve GitHub API responses from a recorded cassette instead of the network; git pushes are skipped.'
+    )
+    parser.add_argument(
+        '--replay-time-scale',
+        type=float,
+        default=1.0,
+        help='Scale recorded response times and waits while replaying; 0 replays without delays (default: 1.0).'
+    )
+    parser.add_argument(
+        '--log-context',
+        type=int,
+        default=3,
+        help='Lines shown around each error found in the log of a failed step with --verbose (default: 3).'
+    )
+    parser.add_argument(
+        '--tail-logs',
+        action='store_true',
+        help="Print each job's build log while the workflow runs, once GitHub has it (usually when the job finishes)."
+    )
+    parser.add_argument(
+        '--cancel-on-failure',
+        action='store_true',
+        help='Cancel the workflow run as soon as one of its steps fails, freeing the macOS runner.'
+    )
+    parser.add_argument(
+        '--no-adaptive-polling',
+        action='store_true',
+        help='Poll every --poll-interval seconds instead of timing polls by the durations of earlier builds.'
+    )
+    parser.add_argument(
+        '--no-graphql',
+        action='store_true',
+        help='Poll build status with the REST API only instead of a single GraphQL query.'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
         help='Enable verbose output.'
     )
+    parser.add_argument(
+        '--startup-profile',
+        action='store_true',
+        help='Report per-module import times for starting the tool and exit.'
+    )
 
     args = parser.parse_args()
 
-    BUILD_TIMEOUT = args.build_timeout
-    POLL_INTERVAL = args.poll_interval
-    BUILD_DIR = args.build_dir
-    IPA_NAME = args.ipa_name
-    PROJECT_PATH = args.project_path
+    if args.webhook_port and not args.webhook_secret:
+        if not args.webhook_url:
+            print(Fore.RED + "✘ --webhook-secret is required to verify webhook deliveries.")
+            sys.exit(1)
+        # The hook is created by this run, so a one-off secret will do.
+        import secrets
+
+        args.webhook_secret = secrets.token_hex(20)
 
-    github_token = get_github_token(args)
+    cassette = None
+    if args.replay:
+        try:
+            cassette = Cassette.load(args.replay)
+        except (OSError, ValueError, CassetteError) as e:
+            print(Fore.RED + f"✘ Cannot read cassette '{args.replay}': {e}")
+            sys.exit(1)
+        # Recorded responses do not depend on the token.
+        github_token = args.token or os.getenv('GITHUB_TOKEN') or "replay"
+    else:
+        if args.record:
+            cassette = Cassette(args.record)
+        github_token = get_github_token(args)
+    # Every cleanup worker needs a pooled connection of its own, plus one for the pipeline
+    # when the cleanup runs in the background.
+    pool_size = max(GitHubContext.pool_size, args.cleanup_workers + 1)
+    ctx = GitHubContext(github_token, pool_size=pool_size, api_url=args.api_url, git_url=args.git_url,
+                        cassette=cassette, replay=bool(args.replay), time_scale=args.replay_time_scale)
+    ctx.use_graphql = not args.no_graphql
 
     if not args.skip_dependencies:
-        check_and_install_dependencies(verbose=args.verbose)
+        check_and_install_dependencies(verbose=args.verbose, refresh=args.refresh_deps)
     else:
         print(Fore.YELLOW + "⚠️  Skipping dependency checks.")
 
+    try:
+        run_pipeline(args, ctx)
+    except CassetteError as e:
+        print(Fore.RED + f"✘ {e}")
+        sys.exit(1)
+    finally:
+        report_retries(ctx, verbose=args.verbose)
+        if args.stats_file:
+            ctx.write_stats(args.stats_file)
+        if args.record:
+            cassette.save()
+            print(Fore.CYAN + f"ℹ️  Recorded {len(cassette.interactions)} HTTP exchanges to '{args.record}'.")
+
+def run_pipeline(args, ctx):
+    BUILD_TIMEOUT = args.build_timeout
+    POLL_INTERVAL = args.poll_interval
+    BUILD_DIR = args.build_dir
+    IPA_NAME = args.ipa_name
+    PROJECT_PATH = args.project_path
+
     repo_name = args.repo
     action = args.action
+    cleanup = None
 
     if action == "createrepo":
-        repo = create_repo(repo_name, github_token, verbose=args.verbose)
-        set_workflow_permissions(repo_name, github_token, verbose=args.verbose)
-        if not args.skip_upload:
-            upload_project(repo_name, github_token, project_path=PROJECT_PATH, verbose=args.verbose)
-        else:
-            print(Fore.YELLOW + "⚠️  Skipping project upload.")
+        with ctx.stage("repository"):
+            repo = create_repo(repo_name, ctx, verbose=args.verbose)
+        with ctx.stage("permissions"):
+            set_workflow_permissions(repo_name, ctx, verbose=args.verbose)
     elif action == "repo":
-        from github import Github, GithubException
-
         # Check if the repository exists
-        g = Github(github_token)
-        user = g.get_user()
-        try:
-            repo = g.get_repo(f"{user.login}/{repo_name}")
-            print(Fore.GREEN + f"✔ Repository '{repo_name}' found.")
-            set_workflow_permissions(repo_name, github_token, verbose=args.verbose)
-            delete_old_workflow_runs(repo, github_token, verbose=args.verbose)
-        except GithubException:
-            print(Fore.RED + f"✘ Repository '{repo_name}' was not found. Please ensure the name is correct.")
-            sys.exit(1)
-        if not args.skip_upload:
-            upload_project(repo_name, github_token, project_path=PROJECT_PATH, verbose=args.verbose)
+        with ctx.stage("repository"):
+            repo = get_existing_repo(repo_name, ctx, verbose=args.verbose)
+        with ctx.stage("permissions"):
+            set_workflow_permissions(repo_name, ctx, verbose=args.verbose)
+        policy = RetentionPolicy(keep_runs=args.keep_runs, keep_days=args.keep_days, keep_failures=args.keep_failures)
+        if args.background_cleanup:
+            # Only runs older than the cleanup are deleted, so the build can start meanwhile.
+            cleanup = start_background_cleanup(repo, ctx, verbose=args.verbose, workers=args.cleanup_workers, policy=policy)
         else:
-            print(Fore.YELLOW + "⚠️  Skipping project upload.")
-
-    # Add GitHub Actions Workflow
-    workflow_yaml = get_workflow_yaml(IPA_NAME)
-    add_github_actions_workflow(workflow_yaml, project_path=PROJECT_PATH, verbose=args.verbose)
+            with ctx.stage("cleanup"):
+                delete_old_workflow_runs(repo, ctx, verbose=args.verbose, workers=args.cleanup_workers, policy=policy)
 
-    if not args.skip_build:
-        # Trigger the Build
-        trigger_workflow_dispatch(repo_name, github_token, verbose=args.verbose)
-
-        # Wait for Build Completion
-        wait_for_workflow_completion(repo, github_token, BUILD_TIMEOUT, POLL_INTERVAL, verbose=args.verbose)
+    try:
+        if ctx.replaying:
+            # Git talks to the remote itself, so pushes cannot be replayed.
+            print(Fore.YELLOW + "⚠️  Replaying a cassette: skipping project upload and workflow push.")
+        elif not args.skip_upload:
+            with ctx.stage("upload"):
+                upload_project(repo_name, ctx, project_path=PROJECT_PATH, verbose=args.verbose)
+        else:
+            print(Fore.YELLOW + "⚠️  Skipping project upload.")
 
-        # Download the IPA
-        download_ipa(repo, BUILD_DIR, IPA_NAME, verbose=args.verbose)
-    else:
-        print(Fore.YELLOW + "⚠️  Skipping build and download steps.")
+        # Add GitHub Actions Workflow
+        if not ctx.replaying:
+            with ctx.stage("workflow"):
+                workflow_yaml = get_workflow_yaml(IPA_NAME)
+                add_github_actions_workflow(workflow_yaml, project_path=PROJECT_PATH, verbose=args.verbose,
+                                            settle_time=args.workflow_settle_time)
+
+        if not args.skip_build:
+            webhook = None
+            hook_id = None
+            if args.webhook_port:
+                # Listen before dispatching so that no delivery is missed.
+                try:
+                    webhook = WebhookReceiver(args.webhook_port, args.webhook_secret).start()
+                except OSError as e:
+                    print(Fore.RED + f"✘ Cannot listen for webhooks on port {args.webhook_port}: {e}")
+                    sys.exit(1)
+                print(Fore.GREEN + f"✔ Listening for webhooks on port {args.webhook_port}.")
+                if args.webhook_url:
+                    hook_id = register_webhook(repo, ctx, args.webhook_url, args.webhook_secret)
+            try:
+                # Trigger the Build
+                with ctx.stage("dispatch"):
+                    dispatch = trigger_workflow_dispatch(repo_name, ctx, verbose=args.verbose)
+
+                # Wait for Build Completion
+                with ctx.stage("wait"):
+                    release_assets = wait_for_workflow_completion(repo, ctx, dispatch, BUILD_TIMEOUT, POLL_INTERVAL,
+                                                                  verbose=args.verbose, webhook=webhook,
+                                                                  adaptive=not args.no_adaptive_polling,
+                                                                  cancel_on_failure=args.cancel_on_failure,
+                                                                  tail_logs=args.tail_logs,
+                                                                  log_context=args.log_context)
+            finally:
+                if webhook is not None:
+                    webhook.stop()
+                if hook_id is not None:
+                    delete_webhook(repo, ctx, hook_id)
+
+            # Download the IPA
+            with ctx.stage("download"):
+                download_ipa(repo, ctx, BUILD_DIR, IPA_NAME, verbose=args.verbose, assets=release_assets)
+        else:
+            print(Fore.YELLOW + "⚠️  Skipping build and download steps.")
+
+    finally:
+        # Also when the build failed: the cleanup thread is a daemon and would be killed on exit.
+        if cleanup is not None:
+            wait_for_background_cleanup(cleanup)
+
+def report_retries(ctx, verbose=False):
+    if ctx.retries:
+        summary = ', '.join(f"{stage}: {count}" for stage, count in ctx.retries.items())
+        print(Fore.YELLOW + f"⚠️  Network retries per stage: {summary}")
+    elif verbose:
+        print(Fore.CYAN + "ℹ️  No network retries were needed.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,98 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Fast-starting build of compiler_gui.py: a onedir layout without UPX, so
+# nothing has to be unpacked or decompressed before main() runs. Build with
+#   pyinstaller compiler_gui_onedir.spec
+# and run dist/compiler_gui_onedir/compiler_gui.
+
+# Standard library modules the GUI never imports.
+stdlib_excludes = [
+    'tkinter',
+    'unittest',
+    'doctest',
+    'pydoc',
+    'pdb',
+    'lib2to3',
+    'test',
+    'xmlrpc',
+    'curses',
+    'sqlite3',
+    'distutils',
+    'setuptools',
+    'pip',
+]
+
+# The window only uses QtCore, QtGui and QtWidgets.
+qt_excludes = [
+    'PyQt5.QtBluetooth',
+    'PyQt5.QtDBus',
+    'PyQt5.QtDesigner',
+    'PyQt5.QtHelp',
+    'PyQt5.QtLocation',
+    'PyQt5.QtMultimedia',
+    'PyQt5.QtMultimediaWidgets',
+    'PyQt5.QtNetwork',
+    'PyQt5.QtNfc',
+    'PyQt5.QtOpenGL',
+    'PyQt5.QtPositioning',
+    'PyQt5.QtPrintSupport',
+    'PyQt5.QtQml',
+    'PyQt5.QtQuick',
+    'PyQt5.QtQuickWidgets',
+    'PyQt5.QtRemoteObjects',
+    'PyQt5.QtSensors',
+    'PyQt5.QtSerialPort',
+    'PyQt5.QtSql',
+    'PyQt5.QtSvg',
+    'PyQt5.QtTest',
+    'PyQt5.QtTextToSpeech',
+    'PyQt5.QtWebChannel',
+    'PyQt5.QtWebEngine',
+    'PyQt5.QtWebEngineCore',
+    'PyQt5.QtWebEngineWidgets',
+    'PyQt5.QtWebSockets',
+    'PyQt5.QtXml',
+    'PyQt5.QtXmlPatterns',
+]
+
+a = Analysis(
+    ['compiler_gui.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('requirements.txt', '.')],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=stdlib_excludes + qt_excludes,
+    noarchive=False,
+    optimize=0,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='compiler_gui',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=['assets\\icons\\ico.ico'],
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='compiler_gui_onedir',
+)
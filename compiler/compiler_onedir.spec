@@ -0,0 +1,66 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Fast-starting build of compiler.py: a onedir layout without UPX, so nothing
+# has to be unpacked or decompressed before main() runs. Build with
+#   pyinstaller compiler_onedir.spec
+# and run dist/compiler_onedir/compiler.
+
+# Standard library and third-party modules the CLI never imports.
+excludes = [
+    'tkinter',
+    'unittest',
+    'doctest',
+    'pydoc',
+    'pdb',
+    'lib2to3',
+    'test',
+    'xmlrpc',
+    'curses',
+    'sqlite3',
+    'distutils',
+    'setuptools',
+    'pip',
+    'PyQt5',
+]
+
+a = Analysis(
+    ['compiler.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('requirements.txt', '.')],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=excludes,
+    noarchive=False,
+    optimize=0,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='compiler',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=['assets\\icons\\ico.ico'],
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='compiler_onedir',
+)
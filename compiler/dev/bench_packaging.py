@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare start-up time of the one-file and onedir PyInstaller builds.
+
+The one-file build (compiler.spec / compiler_gui.spec) unpacks and
+decompresses the whole bundle into a temp dir on every start; the onedir
+build (compiler_onedir.spec / compiler_gui_onedir.spec) does not. For each
+layout this script copies the build to a fresh location, times the first
+``--help`` run there (cold) and then the median of further runs (warm).
+
+    python dev/bench_packaging.py --build --runs 10
+
+``--drop-caches`` additionally drops the Linux page cache before each cold
+run, which requires root.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+COMPILER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXE_SUFFIX = '.exe' if os.name == 'nt' else ''
+
+# (label, spec file, path of the built artifact to copy, executable inside the copy)
+LAYOUTS = {
+    'cli': [
+        ('onefile', 'compiler.spec', 'compiler' + EXE_SUFFIX, 'compiler' + EXE_SUFFIX),
+        ('onedir', 'compiler_onedir.spec', 'compiler_onedir', os.path.join('compiler_onedir', 'compiler' + EXE_SUFFIX)),
+    ],
+    'gui': [
+        ('onefile', 'compiler_gui.spec', 'compiler_gui' + EXE_SUFFIX, 'compiler_gui' + EXE_SUFFIX),
+        ('onedir', 'compiler_gui_onedir.spec', 'compiler_gui_onedir', os.path.join('compiler_gui_onedir', 'compiler_gui' + EXE_SUFFIX)),
+    ],
+}
+
+def build(spec):
+    subprocess.run([sys.executable, '-m', 'PyInstaller', '--noconfirm', spec], cwd=COMPILER_DIR, check=True)
+
+def drop_caches():
+    subprocess.run(['sync'], check=False)
+    with open('/proc/sys/vm/drop_caches', 'w') as f:
+        f.write('3\n')
+
+def time_run(executable):
+    start = time.perf_counter()
+    subprocess.run([executable, '--help'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+def bench_layout(dist_dir, artifact, executable, runs, drop):
+    source = os.path.join(dist_dir, artifact)
+    if not os.path.exists(source):
+        return None
+    with tempfile.TemporaryDirectory() as workdir:
+        target = os.path.join(workdir, artifact)
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        else:
+            shutil.copy2(source, target)
+        if drop:
+            drop_caches()
+        cold = time_run(os.path.join(workdir, executable))
+        warm = statistics.median(time_run(os.path.join(workdir, executable)) for _ in range(runs))
+    return cold, warm
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold and warm start of the packaged executables.")
+    parser.add_argument('--target', choices=['cli', 'gui', 'all'], default='cli', help='Which entry point to benchmark (default: cli).')
+    parser.add_argument('--dist-dir', default=os.path.join(COMPILER_DIR, 'dist'), help='PyInstaller dist directory (default: compiler/dist).')
+    parser.add_argument('--runs', type=int, default=5, help='Warm runs per layout (default: 5).')
+    parser.add_argument('--build', action='store_true', help='Build every spec with PyInstaller first.')
+    parser.add_argument('--drop-caches', action='store_true', help='Drop the Linux page cache before each cold run (root only).')
+    args = parser.parse_args()
+
+    targets = ['cli', 'gui'] if args.target == 'all' else [args.target]
+    print(f"{'target':<8}{'layout':<10}{'cold':>12}{'warm (median)':>16}")
+    for target in targets:
+        for label, spec, artifact, executable in LAYOUTS[target]:
+            if args.build:
+                build(spec)
+            result = bench_layout(args.dist_dir, artifact, executable, args.runs, args.drop_caches)
+            if result is None:
+                print(f"{target:<8}{label:<10}  not built ({spec})")
+                continue
+            cold, warm = result
+            print(f"{target:<8}{label:<10}{cold * 1000:>10.1f}ms{warm * 1000:>14.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the createrepo and repo flows against dev/fake_github.py.
+
+Starts the fake GitHub server in-process, runs ``compiler.py`` against it
+for a scratch Flutter project, and reports wall time, requests (API and git)
+and bytes transferred per pipeline stage. Stages are taken from the
+``--stats-file`` the CLI writes; every request the server saw is attributed
+to the stage that was running when it arrived.
+
+    python dev/bench_pipeline.py --latency-ms 50 --build-seconds 5 --rounds 3
+    python dev/bench_pipeline.py -- --no-graphql
+
+Arguments after ``--`` are passed on to compiler.py.
+"""
+import argparse
+import collections
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_github import FakeGitHub
+
+COMPILER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROJECT_FILES = {
+    'pubspec.yaml': "name: bench_app\nversion: 1.0.0+1\nenvironment:\n  sdk: '>=3.0.0 <4.0.0'\n",
+    'lib/main.dart': "import 'package:flutter/material.dart';\n\nvoid main() => runApp(const Placeholder());\n",
+    'ios/Runner/Info.plist': "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<plist version=\"1.0\"><dict/></plist>\n",
+}
+
+GIT_ENV = {
+    'GIT_AUTHOR_NAME': 'Pear Bench',
+    'GIT_AUTHOR_EMAIL': 'bench@example.com',
+    'GIT_COMMITTER_NAME': 'Pear Bench',
+    'GIT_COMMITTER_EMAIL': 'bench@example.com',
+    'GIT_TERMINAL_PROMPT': '0',
+    # Keep the user's credential helpers and hooks out of the measurement.
+    'GIT_CONFIG_NOSYSTEM': '1',
+    'GIT_CONFIG_GLOBAL': os.devnull,
+}
+
+def create_project(path):
+    for name, content in PROJECT_FILES.items():
+        file_path = os.path.join(path, name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+def run_flow(fake, action, repo_name, project, poll_interval, cli_args):
+    """Run one flow; return (exit status, wall seconds, per-stage rows)."""
+    stats_file = os.path.join(project, '..', f"stats-{action}.json")
+    command = [
+        sys.executable, os.path.join(COMPILER_DIR, 'compiler.py'),
+        '--action', action, '--repo', repo_name, '--token', 'fake-token',
+        '--project-path', project, '--build-dir', os.path.join(project, '..', 'builds'),
+        '--api-url', fake.url, '--git-url', fake.url,
+        '--skip-dependencies', '--workflow-settle-time', '0',
+        '--poll-interval', str(poll_interval), '--stats-file', stats_file,
+    ] + cli_args
+    first_request = len(fake.log)
+    start = time.time()
+    result = subprocess.run(command, env=dict(os.environ, **GIT_ENV), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    wall = time.time() - start
+    if result.returncode != 0:
+        print(result.stdout)
+
+    with open(stats_file, encoding='utf-8') as f:
+        stages = json.load(f)['stages']
+    rows = collections.OrderedDict(
+        (stage['name'], {'wall': stage['end'] - stage['start'], 'api': 0, 'git': 0, 'bytes_in': 0, 'bytes_out': 0})
+        for stage in stages
+    )
+    rows['(other)'] = {'wall': wall - sum(row['wall'] for row in rows.values()), 'api': 0, 'git': 0, 'bytes_in': 0, 'bytes_out': 0}
+    for entry in fake.log[first_request:]:
+        stage = next((s['name'] for s in stages if s['start'] <= entry['time'] <= s['end']), '(other)')
+        row = rows[stage]
+        row['git' if entry['resource'] == 'git' else 'api'] += 1
+        row['bytes_in'] += entry['bytes_in']
+        row['bytes_out'] += entry['bytes_out']
+    return result.returncode, wall, rows
+
+def print_table(action, walls, rounds):
+    print(f"\n{action}: {statistics.median(walls):.2f}s wall (median of {len(walls)})")
+    print(f"{'stage':<14}{'wall':>10}{'api req':>10}{'git req':>10}{'sent':>12}{'received':>12}")
+    totals = collections.Counter()
+    for stage in rounds[0]:
+        values = {key: statistics.median(r[stage][key] for r in rounds if stage in r) for key in rounds[0][stage]}
+        totals.update(values)
+        print(f"{stage:<14}{values['wall']:>9.2f}s{values['api']:>10.0f}{values['git']:>10.0f}"
+              f"{values['bytes_in'] / 1024:>10.1f}KB{values['bytes_out'] / 1024:>10.1f}KB")
+    print(f"{'total':<14}{totals['wall']:>9.2f}s{totals['api']:>10.0f}{totals['git']:>10.0f}"
+          f"{totals['bytes_in'] / 1024:>10.1f}KB{totals['bytes_out'] / 1024:>10.1f}KB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the full pipeline against a local fake GitHub.")
+    parser.add_argument('--latency-ms', type=float, default=50, help='Delay added to every request in milliseconds (default: 50).')
+    parser.add_argument('--build-seconds', type=float, default=5, help='Duration of each fake build (default: 5).')
+    parser.add_argument('--queue-seconds', type=float, default=1, help='Time each fake build spends queued (default: 1).')
+    parser.add_argument('--poll-interval', type=int, default=1, help='--poll-interval passed to compiler.py (default: 1).')
+    parser.add_argument('--ipa-kb', type=int, default=1024, help='Size of the IPA release asset in KiB (default: 1024).')
+    parser.add_argument('--rounds', type=int, default=1, help='Times to run each flow (default: 1).')
+    parser.add_argument('cli_args', nargs=argparse.REMAINDER, help='Extra arguments for compiler.py, after --.')
+    args = parser.parse_args()
+    cli_args = args.cli_args[1:] if args.cli_args[:1] == ['--'] else args.cli_args
+
+    fake = FakeGitHub(latency=args.latency_ms / 1000, build_seconds=args.build_seconds,
+                      queue_seconds=args.queue_seconds, ipa_size=args.ipa_kb * 1024).start()
+    print(f"Fake GitHub at {fake.url}: {args.latency_ms:.0f}ms latency, "
+          f"{args.queue_seconds:.0f}s queued + {args.build_seconds:.0f}s build")
+    results = {'createrepo': ([], []), 'repo': ([], [])}
+    failed = False
+    try:
+        for round_number in range(args.rounds):
+            with tempfile.TemporaryDirectory() as workdir:
+                project = os.path.join(workdir, 'project')
+                create_project(project)
+                repo_name = f"BenchApp{round_number}"
+                # createrepo makes the repository; repo then reuses it.
+                for action in ('createrepo', 'repo'):
+                    returncode, wall, rows = run_flow(fake, action, repo_name, project, args.poll_interval, cli_args)
+                    if returncode != 0:
+                        print(f"{action} exited with status {returncode}")
+                        failed = True
+                    results[action][0].append(wall)
+                    results[action][1].append(rows)
+    finally:
+        fake.stop()
+
+    for action, (walls, rounds) in results.items():
+        if walls:
+            print_table(action, walls, rounds)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
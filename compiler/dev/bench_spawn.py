@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Compare spawning git through the shell with launching it from an argv list.
+
+upload_project and add_github_actions_workflow run roughly 15 git commands per
+build. This script runs a comparable batch of local git commands in a scratch
+repository, once as shell strings (the old ``shell=True`` path) and once as
+argv lists (the path run_command now uses), and reports the per-spawn cost.
+
+    python dev/bench_spawn.py --rounds 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiler import prepare_command
+
+# Local stand-ins for the git calls made during upload and workflow setup.
+GIT_COMMANDS = [
+    ["git", "--version"],
+    ["git", "rev-parse", "--git-dir"],
+    ["git", "remote", "-v"],
+    ["git", "status", "--porcelain"],
+    ["git", "branch", "--show-current"],
+    ["git", "config", "--get", "core.bare"],
+    ["git", "rev-parse", "--git-dir"],
+    ["git", "remote", "-v"],
+    ["git", "status", "--porcelain"],
+    ["git", "log", "-1", "--format=%H"],
+    ["git", "branch", "--show-current"],
+    ["git", "status", "--porcelain"],
+    ["git", "config", "--get", "core.bare"],
+    ["git", "log", "-1", "--format=%H"],
+    ["git", "--version"],
+]
+
+def run_batch(repo, use_shell):
+    durations = []
+    for command in GIT_COMMANDS:
+        if use_shell:
+            args, shell = " ".join(command), True
+        else:
+            args, shell = prepare_command(command)
+        start = time.perf_counter()
+        subprocess.run(args, cwd=repo, shell=shell, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shell vs argv process launching for git commands.")
+    parser.add_argument('--rounds', type=int, default=10, help='Number of batches per mode (default: 10).')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+        subprocess.run(["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com",
+                        "commit", "-q", "--allow-empty", "-m", "bench"], cwd=repo, check=True)
+        # Warm up the page cache for both paths before measuring.
+        run_batch(repo, use_shell=True)
+        run_batch(repo, use_shell=False)
+
+        results = {}
+        for label, use_shell in (("shell=True", True), ("argv", False)):
+            spawns = []
+            for _ in range(args.rounds):
+                spawns.extend(run_batch(repo, use_shell))
+            results[label] = spawns
+
+    batch = len(GIT_COMMANDS)
+    print(f"{batch} git invocations per batch, {args.rounds} batches per mode\n")
+    print(f"{'mode':<12}{'mean/spawn':>14}{'median/spawn':>16}{'per batch':>14}")
+    for label, spawns in results.items():
+        mean = statistics.mean(spawns)
+        print(f"{label:<12}{mean * 1000:>12.2f}ms{statistics.median(spawns) * 1000:>14.2f}ms{mean * batch * 1000:>12.1f}ms")
+
+    saved = statistics.mean(results["shell=True"]) - statistics.mean(results["argv"])
+    print(f"\nSaved per spawn: {saved * 1000:.2f}ms ({saved * batch * 1000:.1f}ms per batch of {batch})")
+
+if __name__ == "__main__":
+    main()
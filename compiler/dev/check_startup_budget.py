@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Guard against startup regressions of the CLI and GUI entry points.
+
+Runs ``compiler.py --help`` and ``compiler_gui.py --help`` several times and
+fails (exit status 1) when the median wall time exceeds the budget, or when
+``--help`` imports one of the heavy modules that are meant to be loaded
+lazily.
+
+    python dev/check_startup_budget.py --budget-ms 300
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+COMPILER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that --help must not import.
+LAZY_MODULES = {
+    'compiler.py': ['requests', 'github', 'asyncio', 'zipfile'],
+    'compiler_gui.py': ['PyQt5', 'requests', 'github', 'asyncio', 'compiler'],
+}
+
+def measure(script, runs):
+    command = [sys.executable, os.path.join(COMPILER_DIR, script), '--help']
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+# Runs a script's --help in a fresh interpreter and reports the modules it
+# imported, ignoring whatever the interpreter itself loaded at startup.
+IMPORT_PROBE = """
+import os, runpy, sys
+script = sys.argv[1]
+before = set(sys.modules)
+sys.argv = [script, '--help']
+sys.path.insert(0, os.path.dirname(script))
+try:
+    runpy.run_path(script, run_name='__main__')
+except SystemExit:
+    pass
+sys.stderr.write('\\n'.join(sorted(set(sys.modules) - before)))
+"""
+
+def imported_modules(script):
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_PROBE, os.path.join(COMPILER_DIR, script)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    return {line.split('.')[0] for line in result.stderr.splitlines()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that --help stays within a startup time budget.")
+    parser.add_argument('--budget-ms', type=float, default=300, help='Maximum median wall time in milliseconds (default: 300).')
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs per entry point (default: 5).')
+    args = parser.parse_args()
+
+    failures = []
+    for script, lazy in LAZY_MODULES.items():
+        median = measure(script, args.runs) * 1000
+        status = "ok" if median <= args.budget_ms else "over budget"
+        print(f"{script:<18} --help median {median:7.1f}ms (budget {args.budget_ms:.0f}ms): {status}")
+        if median > args.budget_ms:
+            failures.append(f"{script} took {median:.1f}ms")
+        eager = sorted(module for module in lazy if module in imported_modules(script))
+        if eager:
+            failures.append(f"{script} --help imports {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,830 @@
+#!/usr/bin/env python3
+"""A local stand-in for the parts of GitHub that compiler.py talks to.
+
+Serves the REST endpoints used by the pipeline (user, repos, Actions
+permissions, workflow dispatch, workflows, runs, run logs, releases and
+their assets), the GraphQL build status query, and git smart-HTTP push and
+fetch through ``git http-backend``. Dispatched runs are queued, then in
+progress, and complete after ``--build-seconds``, at which point the
+``v1.0`` release gets a fresh IPA asset. Their single job walks through the
+steps of the generated workflow; with ``--conclusion failure`` the build
+step fails and the remaining steps are skipped. Runs can be cancelled.
+Like on github.com, the job's log is only served once the job has finished;
+it honours Range requests. Every request is delayed by ``--latency-ms`` and
+recorded in ``FakeGitHub.log`` (also served at ``/_fake/requests``).
+Repository hooks receive signed ``workflow_run`` deliveries as runs
+progress, and a ``release`` delivery when one is published.
+
+    python dev/fake_github.py --port 8765 --latency-ms 50 --build-seconds 10
+    python compiler.py -a createrepo -r Demo -t fake --skip-dependencies \\
+        --api-url http://127.0.0.1:8765 --git-url http://127.0.0.1:8765 \\
+        --workflow-settle-time 0 --poll-interval 1
+
+GET responses carry ETags and honour If-None-Match, and every response has
+X-RateLimit-* headers, so conditional requests and rate-limit pacing behave
+as they do against github.com.
+"""
+import argparse
+import hashlib
+import hmac
+import io
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+WORKFLOW_PATH = '.github/workflows/build_ios.yml'
+DEFAULT_IPA_NAME = 'FlutterIpaExport.ipa'
+RELEASE_TAG = 'v1.0'
+# Steps of the job in the workflow compiler.py generates, as GitHub names them.
+STEPS = ['Set up job', 'Run actions/checkout@v3', 'Run subosito/flutter-action@v2', 'Run flutter pub get',
+         'Run pod repo update', 'Run flutter build ios --release --no-codesign', 'Run mkdir Payload',
+         'Run mv Runner.app/ Payload', 'Zip output', 'Upload binaries to release', 'Complete job']
+FAILING_STEP = 'Run flutter build ios --release --no-codesign'
+LOG_LINES_PER_STEP = 4
+FAILURE_LOG = [
+    "Xcode build done.",
+    "Failed to build iOS app",
+    "Error output from Xcode build:",
+    "** BUILD FAILED **",
+    "lib/main.dart:3:21: Error: Expected ';' after this.",
+    "##[error]Process completed with exit code 1.",
+]
+
+def isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def parse_isoformat(value):
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc).timestamp()
+
+class FakeGitHub:
+    """State of the fake server, and the server itself once ``start`` is called."""
+
+    def __init__(self, login='pear-bench', latency=0.0, build_seconds=10.0, queue_seconds=1.0,
+                 conclusion='success', ipa_size=1024 * 1024, rate_limit=5000):
+        self.login = login
+        self.latency = latency
+        self.build_seconds = build_seconds
+        self.queue_seconds = queue_seconds
+        self.conclusion = conclusion
+        self.ipa_bytes = os.urandom(ipa_size)
+        self.rate_limit = rate_limit
+        self.rate_remaining = {'core': rate_limit, 'graphql': rate_limit}
+        self.rate_reset = int(time.time()) + 3600
+        self.git_root = tempfile.mkdtemp(prefix='fake-github-')
+        self.repos = {}
+        self.ids = itertools.count(1000)
+        self.log = []
+        self.lock = threading.RLock()
+        self.server = None
+        self.thread = None
+
+    # Server lifecycle
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host='127.0.0.1', port=0):
+        handler = type('Handler', (FakeGitHubHandler,), {'fake': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        shutil.rmtree(self.git_root, ignore_errors=True)
+
+    def record(self, **entry):
+        with self.lock:
+            self.log.append(entry)
+
+    # Repositories
+
+    def create_repo(self, name):
+        full_name = f"{self.login}/{name}"
+        with self.lock:
+            if full_name in self.repos:
+                return None
+            git_dir = os.path.join(self.git_root, self.login, f"{name}.git")
+            os.makedirs(git_dir)
+            subprocess.run(['git', 'init', '--bare', '-q', git_dir], check=True)
+            subprocess.run(['git', '--git-dir', git_dir, 'symbolic-ref', 'HEAD', 'refs/heads/main'], check=True)
+            subprocess.run(['git', '--git-dir', git_dir, 'config', 'http.receivepack', 'true'], check=True)
+            repo = {
+                'id': next(self.ids),
+                'name': name,
+                'full_name': full_name,
+                'owner': {'login': self.login},
+                'private': False,
+                'default_branch': 'main',
+                'git_dir': git_dir,
+                'runs': [],
+                'releases': [],
+                'hooks': [],
+            }
+            self.repos[full_name] = repo
+            return repo
+
+    def repo_json(self, repo, base_url):
+        return {
+            'id': repo['id'],
+            'name': repo['name'],
+            'full_name': repo['full_name'],
+            'owner': repo['owner'],
+            'private': repo['private'],
+            'default_branch': repo['default_branch'],
+            'html_url': f"{base_url}/{repo['full_name']}",
+            'clone_url': f"{base_url}/{repo['full_name']}.git",
+        }
+
+    def workflow_file(self, repo):
+        """Contents of the pushed build_ios.yml, or None if it has not been pushed."""
+        result = subprocess.run(
+            ['git', '--git-dir', repo['git_dir'], 'show', f"main:{WORKFLOW_PATH}"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        return result.stdout if result.returncode == 0 else None
+
+    def workflow_json(self, repo, base_url):
+        return {
+            'id': repo['id'] * 10 + 1,
+            'name': 'iOS Build',
+            'path': WORKFLOW_PATH,
+            'state': 'active',
+            'url': f"{base_url}/repos/{repo['full_name']}/actions/workflows/{repo['id'] * 10 + 1}",
+        }
+
+    # Workflow runs
+
+    def dispatch(self, repo, inputs):
+        workflow = self.workflow_file(repo)
+        if workflow is None:
+            return False
+        match = re.search(r'file:\s*\S*?([^/\s]+\.ipa)\s*$', workflow, re.MULTILINE)
+        now = time.time()
+        with self.lock:
+            run_id = next(self.ids)
+            run = {
+                'id': run_id,
+                'inputs': dict(inputs or {}),
+                'ipa_name': match.group(1) if match else DEFAULT_IPA_NAME,
+                'created': now,
+                'cancelled': None,
+                'released': False,
+            }
+            repo['runs'].append(run)
+        if repo['hooks']:
+            # Deliver each transition just after it happens.
+            for action, delay in (('requested', 0), ('in_progress', self.queue_seconds),
+                                  ('completed', self.queue_seconds + self.build_seconds)):
+                timer = threading.Timer(delay + 0.01, self.deliver_run_event, (repo, run, action))
+                timer.daemon = True
+                timer.start()
+        return True
+
+    # Webhooks
+
+    def deliver(self, repo, event, payload):
+        body = json.dumps(payload).encode('utf-8')
+        for hook in list(repo['hooks']):
+            signature = 'sha256=' + hmac.new(hook['secret'].encode('utf-8'), body, hashlib.sha256).hexdigest()
+            request = urllib.request.Request(hook['url'], data=body, method='POST', headers={
+                'Content-Type': 'application/json',
+                'X-GitHub-Event': event,
+                'X-GitHub-Delivery': str(uuid.uuid4()),
+                'X-Hub-Signature-256': signature,
+            })
+            try:
+                urllib.request.urlopen(request, timeout=10).close()
+            except OSError:
+                pass
+
+    def deliver_run_event(self, repo, run, action):
+        if run not in repo['runs']:
+            return
+        released = run['released']
+        payload = {'action': action, 'workflow_run': self.run_json(repo, run, self.url)}
+        if not released and run['released']:
+            release = self.release_json(repo, repo['releases'][0], self.url)
+            self.deliver(repo, 'release', {'action': 'published', 'release': release})
+        self.deliver(repo, 'workflow_run', payload)
+
+    def run_state(self, repo, run):
+        """Status and conclusion of ``run`` now; publishes the release when it completes."""
+        if run['cancelled'] is not None:
+            return 'completed', 'cancelled'
+        elapsed = time.time() - run['created']
+        if elapsed < self.queue_seconds:
+            return 'queued', None
+        if elapsed < self.queue_seconds + self.build_seconds:
+            return 'in_progress', None
+        if self.conclusion == 'success' and not run['released']:
+            self.publish_release(repo, run)
+        return 'completed', self.conclusion
+
+    def publish_release(self, repo, run):
+        with self.lock:
+            if run['released']:
+                return
+            run['released'] = True
+            # The workflow overwrites the assets of one fixed tag.
+            repo['releases'] = [release for release in repo['releases'] if release['tag_name'] != RELEASE_TAG]
+            repo['releases'].insert(0, {
+                'id': next(self.ids),
+                'tag_name': RELEASE_TAG,
+                'created': time.time(),
+                'assets': [{'id': next(self.ids), 'name': run['ipa_name'], 'size': len(self.ipa_bytes)}],
+            })
+
+    def run_json(self, repo, run, base_url):
+        status, conclusion = self.run_state(repo, run)
+        finished = run['created'] + self.queue_seconds + self.build_seconds
+        return {
+            'id': run['id'],
+            'name': 'iOS Build',
+            # The workflow's run-name: "iOS Build ${{ inputs.dispatch_id }}".
+            'display_title': f"iOS Build {run['inputs'].get('dispatch_id', '')}".strip(),
+            'workflow_id': repo['id'] * 10 + 1,
+            'path': WORKFLOW_PATH,
+            'event': 'workflow_dispatch',
+            'head_branch': 'main',
+            'status': status,
+            'conclusion': conclusion,
+            'created_at': isoformat(run['created']),
+            'run_started_at': isoformat(run['created'] + self.queue_seconds),
+            'updated_at': isoformat(min(time.time(), finished)),
+            'html_url': f"{base_url}/{repo['full_name']}/actions/runs/{run['id']}",
+        }
+
+    def job_json(self, repo, run, base_url):
+        """The run's only job; its steps share the build time evenly."""
+        status, conclusion = self.run_state(repo, run)
+        started = run['created'] + self.queue_seconds
+        now = time.time() if run['cancelled'] is None else min(time.time(), run['cancelled'])
+        step_seconds = self.build_seconds / len(STEPS)
+        failed_at = None
+        steps = []
+        for number, name in enumerate(STEPS, start=1):
+            begin = started + (number - 1) * step_seconds
+            end = begin + step_seconds
+            step = {'name': name, 'number': number, 'status': 'queued', 'conclusion': None,
+                    'started_at': None, 'completed_at': None}
+            if failed_at is not None and name != 'Complete job':
+                step.update(status='completed', conclusion='skipped')
+            elif now >= end:
+                failed = self.conclusion == 'failure' and name == FAILING_STEP
+                step.update(status='completed', conclusion='failure' if failed else 'success',
+                            started_at=isoformat(begin), completed_at=isoformat(end))
+                if failed:
+                    failed_at = end
+            elif now >= begin:
+                step.update(status='in_progress', started_at=isoformat(begin))
+            steps.append(step)
+        return {
+            'id': run['id'] * 10 + 1,
+            'run_id': run['id'],
+            'name': 'iOS Build',
+            'status': status,
+            'conclusion': conclusion,
+            'started_at': isoformat(started) if status != 'queued' else None,
+            'html_url': f"{base_url}/{repo['full_name']}/actions/runs/{run['id']}/job/{run['id'] * 10 + 1}",
+            'steps': steps,
+        }
+
+    def job_log(self, repo, run):
+        """Log of the run's job as far as it has got; ends with the failure output if the build step failed."""
+        started = run['created'] + self.queue_seconds
+        now = time.time() if run['cancelled'] is None else min(time.time(), run['cancelled'])
+        step_seconds = self.build_seconds / len(STEPS)
+        lines = []
+        for number, name in enumerate(STEPS):
+            begin = started + number * step_seconds
+            if now < begin:
+                break
+            lines.append(f"{isoformat(begin)} ##[group]{name}")
+            for line in range(1, LOG_LINES_PER_STEP + 1):
+                at = begin + line * step_seconds / (LOG_LINES_PER_STEP + 1)
+                if now >= at:
+                    lines.append(f"{isoformat(at)} {name}: output line {line}")
+            if now < begin + step_seconds:
+                break
+            if self.conclusion == 'failure' and name == FAILING_STEP:
+                lines.extend(f"{isoformat(begin + step_seconds)} {line}" for line in FAILURE_LOG)
+                break
+            lines.append(f"{isoformat(begin + step_seconds)} ##[endgroup]")
+        return ''.join(line + '\n' for line in lines).encode('utf-8')
+
+    def find_run(self, repo, run_id):
+        return next((run for run in repo['runs'] if run['id'] == run_id), None)
+
+    def logs_zip(self, repo, run):
+        """The run's logs archive: the whole job log, and one file per step."""
+        log = self.job_log(repo, run).decode('utf-8')
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('0_iOS Build.txt', log)
+            steps = re.split(r'^(?=\S+ ##\[group\])', log, flags=re.MULTILINE)
+            for number, step_log in enumerate(filter(None, steps), start=1):
+                name = STEPS[number - 1].replace('/', '')
+                archive.writestr(f"iOS Build/{number}_{name}.txt", step_log)
+        return buffer.getvalue()
+
+    def release_json(self, repo, release, base_url):
+        return {
+            'id': release['id'],
+            'tag_name': release['tag_name'],
+            'name': release['tag_name'],
+            'created_at': isoformat(release['created']),
+            'assets': [
+                {
+                    'id': asset['id'],
+                    'name': asset['name'],
+                    'size': asset['size'],
+                    'url': f"{base_url}/repos/{repo['full_name']}/releases/assets/{asset['id']}",
+                    'browser_download_url': f"{base_url}/{repo['full_name']}/releases/download/{release['tag_name']}/{asset['name']}",
+                }
+                for asset in release['assets']
+            ],
+        }
+
+    def build_status(self, repo, base_url):
+        """Answer to compiler.BUILD_STATUS_QUERY."""
+        suites = []
+        for run in repo['runs'][-20:]:
+            status, conclusion = self.run_state(repo, run)
+            suites.append({
+                'status': status.upper(),
+                'conclusion': conclusion.upper() if conclusion else None,
+                'workflowRun': {'databaseId': run['id'], 'file': {'path': WORKFLOW_PATH}},
+            })
+        release = repo['releases'][0] if repo['releases'] else None
+        return {
+            'repository': {
+                'defaultBranchRef': {'target': {'checkSuites': {'nodes': suites}}},
+                'latestRelease': release and {
+                    'releaseAssets': {
+                        'nodes': [
+                            {'name': asset['name'], 'downloadUrl': asset['browser_download_url']}
+                            for asset in self.release_json(repo, release, base_url)['assets']
+                        ]
+                    }
+                },
+            }
+        }
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    fake = None
+
+    ROUTES = [
+        ('GET', r'/user', 'get_user'),
+        ('POST', r'/user/repos', 'post_user_repos'),
+        ('POST', r'/graphql', 'post_graphql'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)', 'get_repo'),
+        ('PUT', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/permissions(?:/workflow)?', 'put_permissions'),
+        ('POST', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/hooks', 'post_hook'),
+        ('DELETE', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/hooks/(?P<hook_id>\d+)', 'delete_hook'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/workflows', 'get_workflows'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/workflows/(?P<workflow>[^/]+)', 'get_workflow'),
+        ('POST', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/workflows/(?P<workflow>[^/]+)/dispatches', 'post_dispatch'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/workflows/(?P<workflow>[^/]+)/runs', 'get_runs'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/runs', 'get_runs'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/runs/(?P<run_id>\d+)', 'get_run'),
+        ('DELETE', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/runs/(?P<run_id>\d+)', 'delete_run'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/runs/(?P<run_id>\d+)/jobs', 'get_run_jobs'),
+        ('POST', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/runs/(?P<run_id>\d+)/cancel', 'post_cancel'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/jobs/(?P<job_id>\d+)/logs', 'get_job_logs'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/runs/(?P<run_id>\d+)/logs', 'get_run_logs'),
+        ('GET', r'/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/releases', 'get_releases'),
+        ('GET', r'/(?P<owner>[^/]+)/(?P<repo>[^/]+)/releases/download/(?P<tag>[^/]+)/(?P<name>[^/]+)', 'get_asset'),
+        ('GET', r'/_fake/logs/(?P<owner>[^/]+)/(?P<repo>[^/]+)/(?P<run_id>\d+)\.zip', 'get_logs_blob'),
+        ('GET', r'/_fake/job-logs/(?P<owner>[^/]+)/(?P<repo>[^/]+)/(?P<job_id>\d+)\.txt', 'get_job_log_blob'),
+        ('GET', r'/_fake/requests', 'get_request_log'),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch_request()
+
+    def do_POST(self):
+        self.dispatch_request()
+
+    def do_PUT(self):
+        self.dispatch_request()
+
+    def do_DELETE(self):
+        self.dispatch_request()
+
+    # Plumbing
+
+    @property
+    def base_url(self):
+        return f"http://{self.headers.get('Host', '%s:%s' % self.server.server_address[:2])}"
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the final empty line.
+                    while self.rfile.readline().strip():
+                        pass
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def dispatch_request(self):
+        started = time.time()
+        parts = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.body = self.read_body()
+        self.bytes_out = 0
+        self.resource = 'git' if '.git/' in parts.path or parts.path.endswith('.git') else 'core'
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        try:
+            if self.resource == 'git':
+                self.serve_git(parts.path)
+            else:
+                self.route(parts.path)
+        finally:
+            self.fake.record(
+                time=started, method=self.command, path=parts.path, resource=self.resource,
+                status=getattr(self, 'status', None), bytes_in=len(self.body), bytes_out=self.bytes_out,
+            )
+
+    def route(self, path):
+        for method, pattern, handler in self.ROUTES:
+            if method != self.command:
+                continue
+            match = re.fullmatch(pattern, path)
+            if match:
+                return getattr(self, handler)(**match.groupdict())
+        self.send_json({'message': 'Not Found'}, status=404)
+
+    def send_bytes(self, status, body=b'', content_type='application/json', headers=None):
+        self.status = status
+        self.send_response(status)
+        resource = 'graphql' if self.path.startswith('/graphql') else 'core'
+        if status != 304:
+            with self.fake.lock:
+                self.fake.rate_remaining[resource] = max(0, self.fake.rate_remaining[resource] - 1)
+        self.send_header('X-RateLimit-Limit', str(self.fake.rate_limit))
+        self.send_header('X-RateLimit-Remaining', str(self.fake.rate_remaining[resource]))
+        self.send_header('X-RateLimit-Reset', str(self.fake.rate_reset))
+        self.send_header('X-RateLimit-Resource', resource)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status in (204, 304):
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.bytes_out = len(body)
+
+    def send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        headers = dict(headers or {})
+        if self.command == 'GET' and status == 200:
+            etag = 'W/"%s"' % hashlib.sha1(body).hexdigest()
+            headers['ETag'] = etag
+            if self.headers.get('If-None-Match') == etag:
+                return self.send_bytes(304, headers=headers)
+        self.send_bytes(status, body, headers=headers)
+
+    def send_page(self, items, key=None, extra=None):
+        """Send one page of ``items`` with GitHub's per_page/page parameters and Link header."""
+        per_page = min(int(self.query.get('per_page', 30)), 100)
+        page = max(int(self.query.get('page', 1)), 1)
+        chunk = items[(page - 1) * per_page:page * per_page]
+        headers = {}
+        if page * per_page < len(items):
+            query = dict(self.query, page=page + 1, per_page=per_page)
+            next_url = f"{self.base_url}{urlsplit(self.path).path}?{urlencode(query)}"
+            headers['Link'] = f'<{next_url}>; rel="next"'
+        if key is None:
+            return self.send_json(chunk, headers=headers)
+        self.send_json(dict(extra or {}, total_count=len(items), **{key: chunk}), headers=headers)
+
+    def repo_or_404(self, owner, repo):
+        found = self.fake.repos.get(f"{owner}/{repo}")
+        if found is None:
+            self.send_json({'message': 'Not Found'}, status=404)
+        return found
+
+    # REST endpoints
+
+    def get_user(self):
+        self.send_json({'login': self.fake.login, 'id': 1})
+
+    def post_user_repos(self):
+        data = json.loads(self.body or b'{}')
+        repo = self.fake.create_repo(data['name'])
+        if repo is None:
+            return self.send_json({
+                'message': 'Repository creation failed.',
+                'errors': [{'resource': 'Repository', 'field': 'name', 'message': 'name already exists on this account'}],
+            }, status=422)
+        self.send_json(self.fake.repo_json(repo, self.base_url), status=201)
+
+    def get_repo(self, owner, repo):
+        found = self.repo_or_404(owner, repo)
+        if found:
+            self.send_json(self.fake.repo_json(found, self.base_url))
+
+    def put_permissions(self, owner, repo):
+        if self.repo_or_404(owner, repo):
+            self.send_bytes(204)
+
+    def post_hook(self, owner, repo):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        data = json.loads(self.body or b'{}')
+        config = data.get('config') or {}
+        hook = {'id': next(self.fake.ids), 'url': config.get('url'), 'secret': config.get('secret', ''),
+                'events': data.get('events', ['push'])}
+        with self.fake.lock:
+            found['hooks'].append(hook)
+        self.send_json({'id': hook['id'], 'name': 'web', 'active': True, 'events': hook['events'],
+                        'config': {'url': hook['url'], 'content_type': 'json'}}, status=201)
+
+    def delete_hook(self, owner, repo, hook_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        with self.fake.lock:
+            hooks = [hook for hook in found['hooks'] if hook['id'] != int(hook_id)]
+            removed = len(hooks) != len(found['hooks'])
+            found['hooks'] = hooks
+        if removed:
+            return self.send_bytes(204)
+        self.send_json({'message': 'Not Found'}, status=404)
+
+    def get_workflows(self, owner, repo):
+        found = self.repo_or_404(owner, repo)
+        if found:
+            workflows = [self.fake.workflow_json(found, self.base_url)] if self.fake.workflow_file(found) else []
+            self.send_page(workflows, 'workflows')
+
+    def workflow_exists(self, repo, workflow):
+        """Whether ``workflow`` (an ID or file name) names the pushed build workflow."""
+        data = self.fake.workflow_json(repo, self.base_url)
+        return workflow in (str(data['id']), os.path.basename(WORKFLOW_PATH)) and self.fake.workflow_file(repo) is not None
+
+    def get_workflow(self, owner, repo, workflow):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        if self.workflow_exists(found, workflow):
+            return self.send_json(self.fake.workflow_json(found, self.base_url))
+        self.send_json({'message': 'Not Found'}, status=404)
+
+    def post_dispatch(self, owner, repo, workflow):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        data = json.loads(self.body or b'{}')
+        if self.fake.dispatch(found, data.get('inputs')):
+            return self.send_bytes(204)
+        self.send_json({'message': 'Not Found'}, status=404)
+
+    def get_runs(self, owner, repo, workflow=None):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        if workflow is not None and not self.workflow_exists(found, workflow):
+            return self.send_json({'message': 'Not Found'}, status=404)
+        runs = [self.fake.run_json(found, run, self.base_url) for run in reversed(found['runs'])]
+        for field in ('status', 'event'):
+            if field in self.query:
+                runs = [run for run in runs if run[field] == self.query[field]]
+        if 'branch' in self.query:
+            runs = [run for run in runs if run['head_branch'] == self.query['branch']]
+        created = self.query.get('created', '')
+        if created.startswith('>='):
+            since = parse_isoformat(created[2:])
+            runs = [run for run in runs if parse_isoformat(run['created_at']) >= since]
+        elif created.startswith('<'):
+            until = parse_isoformat(created[1:])
+            runs = [run for run in runs if parse_isoformat(run['created_at']) < until]
+        self.send_page(runs, 'workflow_runs')
+
+    def get_run(self, owner, repo, run_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        run = self.fake.find_run(found, int(run_id))
+        if run is None:
+            return self.send_json({'message': 'Not Found'}, status=404)
+        self.send_json(self.fake.run_json(found, run, self.base_url))
+
+    def delete_run(self, owner, repo, run_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        with self.fake.lock:
+            run = self.fake.find_run(found, int(run_id))
+            if run is None:
+                return self.send_json({'message': 'Not Found'}, status=404)
+            found['runs'].remove(run)
+        self.send_bytes(204)
+
+    def get_run_jobs(self, owner, repo, run_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        run = self.fake.find_run(found, int(run_id))
+        if run is None:
+            return self.send_json({'message': 'Not Found'}, status=404)
+        self.send_page([self.fake.job_json(found, run, self.base_url)], 'jobs')
+
+    def post_cancel(self, owner, repo, run_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        with self.fake.lock:
+            run = self.fake.find_run(found, int(run_id))
+            if run is None:
+                return self.send_json({'message': 'Not Found'}, status=404)
+            if self.fake.run_state(found, run)[0] == 'completed':
+                return self.send_json({'message': 'Cannot cancel a workflow run that is completed.'}, status=409)
+            run['cancelled'] = time.time()
+        self.send_json({}, status=202)
+
+    def get_run_logs(self, owner, repo, run_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        if self.fake.find_run(found, int(run_id)) is None:
+            return self.send_json({'message': 'Not Found'}, status=404)
+        # Like github.com, redirect to short-lived blob storage.
+        self.send_bytes(302, b'', headers={'Location': f"{self.base_url}/_fake/logs/{owner}/{repo}/{run_id}.zip"})
+
+    def get_logs_blob(self, owner, repo, run_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        run = self.fake.find_run(found, int(run_id))
+        if run is None:
+            return self.send_json({'message': 'Not Found'}, status=404)
+        self.send_bytes(200, self.fake.logs_zip(found, run), content_type='application/zip')
+
+    def find_job_run(self, found, job_id):
+        # Every run has exactly one job, whose ID is derived from the run's.
+        job_id = int(job_id)
+        run = self.fake.find_run(found, job_id // 10)
+        return run if run is not None and job_id % 10 == 1 else None
+
+    def get_job_logs(self, owner, repo, job_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        run = self.find_job_run(found, job_id)
+        # Like github.com, the log is only served once the job has finished.
+        if run is None or self.fake.run_state(found, run)[0] != 'completed':
+            return self.send_json({'message': 'Not Found'}, status=404)
+        self.send_bytes(302, b'', headers={'Location': f"{self.base_url}/_fake/job-logs/{owner}/{repo}/{job_id}.txt"})
+
+    def get_job_log_blob(self, owner, repo, job_id):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        run = self.find_job_run(found, job_id)
+        if run is None:
+            return self.send_json({'message': 'Not Found'}, status=404)
+        log = self.fake.job_log(found, run)
+        match = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range', ''))
+        if match is None:
+            return self.send_bytes(200, log, content_type='text/plain; charset=utf-8')
+        start = int(match.group(1))
+        if start >= len(log):
+            return self.send_bytes(416, b'', content_type='text/plain', headers={'Content-Range': f"bytes */{len(log)}"})
+        self.send_bytes(206, log[start:], content_type='text/plain; charset=utf-8',
+                        headers={'Content-Range': f"bytes {start}-{len(log) - 1}/{len(log)}"})
+
+    def get_releases(self, owner, repo):
+        found = self.repo_or_404(owner, repo)
+        if found:
+            self.send_page([self.fake.release_json(found, release, self.base_url) for release in found['releases']])
+
+    def get_asset(self, owner, repo, tag, name):
+        found = self.repo_or_404(owner, repo)
+        if not found:
+            return
+        for release in found['releases']:
+            if release['tag_name'] == tag and any(asset['name'] == name for asset in release['assets']):
+                return self.send_bytes(200, self.fake.ipa_bytes, content_type='application/octet-stream')
+        self.send_json({'message': 'Not Found'}, status=404)
+
+    def get_request_log(self):
+        with self.fake.lock:
+            log = list(self.fake.log)
+        self.send_json(log)
+
+    # GraphQL
+
+    def post_graphql(self):
+        request = json.loads(self.body or b'{}')
+        variables = request.get('variables') or {}
+        if 'checkSuites' not in request.get('query', ''):
+            return self.send_json({'errors': [{'message': 'The fake server only answers the build status query.'}]})
+        found = self.fake.repos.get(f"{variables.get('owner')}/{variables.get('name')}")
+        if found is None:
+            return self.send_json({'data': {'repository': None}, 'errors': [{'type': 'NOT_FOUND', 'message': 'Could not resolve to a Repository.'}]})
+        self.send_json({'data': self.fake.build_status(found, self.base_url)})
+
+    # git smart HTTP
+
+    def serve_git(self, path):
+        """Run ``git http-backend`` as a CGI script for push and fetch."""
+        environ = dict(
+            os.environ,
+            GIT_PROJECT_ROOT=self.fake.git_root,
+            GIT_HTTP_EXPORT_ALL='1',
+            PATH_INFO=path,
+            QUERY_STRING=urlsplit(self.path).query,
+            REQUEST_METHOD=self.command,
+            CONTENT_TYPE=self.headers.get('Content-Type', ''),
+            CONTENT_LENGTH=str(len(self.body)),
+            REMOTE_ADDR=self.client_address[0],
+            REMOTE_USER=self.fake.login,
+        )
+        for header in ('Content-Encoding', 'Git-Protocol'):
+            if header in self.headers:
+                environ['HTTP_' + header.upper().replace('-', '_')] = self.headers[header]
+        result = subprocess.run(['git', 'http-backend'], input=self.body, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, env=environ)
+        # CGI headers end at the first blank line, with or without carriage returns.
+        output = result.stdout
+        ends = [(output.find(separator), separator) for separator in (b'\r\n\r\n', b'\n\n') if separator in output]
+        index, separator = min(ends) if ends else (len(output), b'')
+        head, body = output[:index], output[index + len(separator):]
+        status = 200
+        headers = {}
+        for line in head.decode('latin-1').splitlines():
+            name, _, value = line.partition(':')
+            if name.lower() == 'status':
+                status = int(value.split()[0])
+            elif name:
+                headers[name.strip()] = value.strip()
+        self.status = status
+        self.send_response(status)
+        for name, value in headers.items():
+            if name.lower() != 'content-length':
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.bytes_out = len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake GitHub API and git server.")
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1).')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765).')
+    parser.add_argument('--login', default='pear-bench', help='Login of the fake authenticated user (default: pear-bench).')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every request in milliseconds (default: 0).')
+    parser.add_argument('--build-seconds', type=float, default=10, help='How long a dispatched build runs (default: 10).')
+    parser.add_argument('--queue-seconds', type=float, default=1, help='How long a dispatched build is queued (default: 1).')
+    parser.add_argument('--conclusion', default='success', help='Conclusion of every build (default: success).')
+    parser.add_argument('--ipa-kb', type=int, default=1024, help='Size of the IPA release asset in KiB (default: 1024).')
+    args = parser.parse_args()
+
+    fake = FakeGitHub(login=args.login, latency=args.latency_ms / 1000, build_seconds=args.build_seconds,
+                      queue_seconds=args.queue_seconds, conclusion=args.conclusion, ipa_size=args.ipa_kb * 1024)
+    fake.start(args.host, args.port)
+    print(f"Fake GitHub listening on {fake.url} (git repositories in {fake.git_root}). Press Ctrl+C to stop.")
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Send recorded GitHub webhook payloads to a local receiver.
+
+Each payload file holds the JSON body of one delivery, as shown under
+"Recent Deliveries" in a repository's webhook settings. The event type is
+taken from ``--event`` or guessed from the payload (``workflow_run`` or
+``release``). Deliveries are signed with ``--secret`` the way GitHub signs
+them, so they pass the receiver's X-Hub-Signature-256 check.
+
+    python compiler.py -a repo -r MyApp --webhook-port 8080 --webhook-secret s3cret
+    python dev/send_webhook.py --secret s3cret --run-id 123 --title "iOS Build <dispatch id>" \\
+        dev/webhook_payloads/workflow_run_completed.json
+
+``--run-id`` and ``--title`` overwrite the run's ID and display title, so a
+recorded payload can be aimed at the run that is currently being waited for.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+def guess_event(payload):
+    for event in ('workflow_run', 'release'):
+        if event in payload:
+            return event
+    return 'ping'
+
+def send(url, secret, event, payload):
+    body = json.dumps(payload).encode('utf-8')
+    signature = 'sha256=' + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    request = urllib.request.Request(url, data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        'User-Agent': 'GitHub-Hookshot/send-webhook',
+        'X-GitHub-Event': event,
+        'X-GitHub-Delivery': str(uuid.uuid4()),
+        'X-Hub-Signature-256': signature,
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded webhook payloads against a local receiver.")
+    parser.add_argument('payloads', nargs='+', help='JSON files with one delivery body each.')
+    parser.add_argument('--url', default='http://127.0.0.1:8080/', help='Receiver URL (default: http://127.0.0.1:8080/).')
+    parser.add_argument('--secret', required=True, help='Webhook secret the receiver was started with.')
+    parser.add_argument('--event', help='Event type for every payload (default: guessed from the payload).')
+    parser.add_argument('--run-id', type=int, help='Replace workflow_run.id in the payloads.')
+    parser.add_argument('--title', help='Replace workflow_run.display_title in the payloads.')
+    parser.add_argument('--delay', type=float, default=0, help='Seconds to wait between deliveries (default: 0).')
+    args = parser.parse_args()
+
+    failed = False
+    for number, path in enumerate(args.payloads):
+        if number and args.delay:
+            time.sleep(args.delay)
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        run = payload.get('workflow_run')
+        if run is not None:
+            if args.run_id is not None:
+                run['id'] = args.run_id
+            if args.title is not None:
+                run['display_title'] = args.title
+        event = args.event or guess_event(payload)
+        status = send(args.url, args.secret, event, payload)
+        print(f"{path}: {event} -> {status}")
+        failed = failed or not 200 <= status < 300
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()